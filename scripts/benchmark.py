@@ -0,0 +1,63 @@
+import sys
+
+import hydra
+
+from src import CONFIGS_PATH
+from src.benchmarks.suite import (
+    BENCHMARKS_DIR,
+    find_regressions,
+    format_results,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+from src.config.config import Config
+from src.config.environment.environment import EnvironmentConfig
+
+
+@hydra.main(version_base=None, config_path=str(CONFIGS_PATH), config_name="default")
+def main(cfg: Config):
+    """
+    Benchmark the hot paths of the game on every configured environment, save the results to a JSON file, and compare
+    them against a baseline. Exits with an error if any benchmark regressed by more than the tolerance.
+
+    Parameters
+    ----------
+    cfg: Config
+        Config.
+
+    Returns
+    -------
+    """
+    results = []
+    for environment_name in cfg.benchmark.environment_names:
+        results.extend(
+            run_benchmarks(
+                EnvironmentConfig(name=environment_name, test=cfg.benchmark.test),
+                num_steps=cfg.benchmark.num_steps,
+                repeats=cfg.benchmark.repeats,
+                num_eigenvectors=cfg.benchmark.num_eigenvectors,
+            )
+        )
+
+    results_path = BENCHMARKS_DIR / f"{cfg.benchmark.results_name}.json"
+    save_results(results, results_path)
+
+    baseline = None
+    if cfg.benchmark.baseline_name is not None:
+        baseline = load_results(BENCHMARKS_DIR / f"{cfg.benchmark.baseline_name}.json")
+
+    print(format_results(results, baseline))
+    print(f"\nSaved the results to {results_path}")
+
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, cfg.benchmark.tolerance)
+        if regressions:
+            print(f"\nRegressions of more than {cfg.benchmark.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"{regression.key}: {regression.baseline:.3g} -> {regression.value:.3g} {regression.unit}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
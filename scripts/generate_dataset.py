@@ -0,0 +1,66 @@
+import time
+
+import hydra
+
+from src import CONFIGS_PATH
+from src.config.config import Config
+from src.dataset.shards import DATASETS_DIR, SCENARIO_FIELDS, ShardWriter
+from src.environment.factory import make_environment
+from src.game.game import Game
+from src.game.pool import GamePool
+
+
+@hydra.main(version_base=None, config_path=str(CONFIGS_PATH), config_name="default")
+def main(cfg: Config):
+    """
+    Generate a dataset of overload scenarios, i.e., the states at which `Game.continue_simulation` stops, by running
+    rollouts in parallel and writing the ones that end in an overload into compressed shards.
+
+    Parameters
+    ----------
+    cfg: Config
+        Config.
+
+    Returns
+    -------
+    """
+    environment = make_environment(cfg.environment)
+    rho_start, rho_end, _ = environment.observation_space.get_indx_extract("rho")
+
+    metadata = {
+        "environment_name": cfg.environment.name,
+        "test": cfg.environment.test,
+        "observation_size": int(environment.observation_space.size()),
+        "rho_threshold": Game.rho_threshold,
+        "random_seed": cfg.random_seed,
+    }
+
+    start_time = time.perf_counter()
+    with GamePool(
+        cfg.environment,
+        num_workers=cfg.dataset.num_workers,
+        max_steps=cfg.dataset.max_steps,
+        random_start=cfg.dataset.random_start,
+    ) as pool, ShardWriter(
+        cfg.dataset.name, shard_size=cfg.dataset.shard_size, directory=DATASETS_DIR, metadata=metadata
+    ) as writer:
+        # one shard worth of rollouts at a time, so that the results never have to fit into memory
+        for start in range(0, cfg.dataset.num_rollouts, cfg.dataset.shard_size):
+            num_rollouts = min(cfg.dataset.shard_size, cfg.dataset.num_rollouts - start)
+            results = pool.run(num_rollouts, seed=cfg.random_seed, start=start)
+
+            overloaded = (results.observations[:, rho_start:rho_end] >= Game.rho_threshold).any(axis=1)
+            keep = overloaded & ~results.done
+
+            writer.append({field: getattr(results, field)[keep] for field in SCENARIO_FIELDS})
+
+        num_scenarios = len(writer)
+
+    print(
+        f"Kept {num_scenarios} of {cfg.dataset.num_rollouts} rollouts in {DATASETS_DIR / cfg.dataset.name}"
+        f" in {time.perf_counter() - start_time:.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import sys
+
+import hydra
+
+from src import CONFIGS_PATH
+from src.benchmarks.import_times import (
+    format_import_report,
+    measure_import_times,
+    total_import_time,
+)
+from src.config.config import Config
+
+
+@hydra.main(version_base=None, config_path=str(CONFIGS_PATH), config_name="default")
+def main(cfg: Config):
+    """
+    Report how long it takes to import the modules of the package, each in a fresh Python process, and which packages
+    the time goes to. Exits with an error if any module takes longer than the configured maximum, so the import times
+    can be tracked, e.g., in CI.
+
+    Parameters
+    ----------
+    cfg: Config
+        Config.
+
+    Returns
+    -------
+    """
+    module_records = {module: measure_import_times(module) for module in cfg.import_times.modules}
+    print(format_import_report(module_records, cfg.import_times.num_packages))
+
+    max_seconds = cfg.import_times.max_seconds
+    if max_seconds is not None:
+        slow_modules = [
+            module for module, records in module_records.items() if total_import_time(records) > max_seconds
+        ]
+        if slow_modules:
+            print(f"\nSlower to import than {max_seconds} s: {', '.join(slow_modules)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,18 @@
+import random
 from typing import Any
 
-import grid2op
 import hydra
-import matplotlib.pyplot as plt
-import networkx as nx
 import numpy as np
-import torch
-from torch_geometric import seed_everything
-from torch_geometric.data import Data
-from torch_geometric.transforms import (
-    AddLaplacianEigenvectorPE,
-    Compose,
-    LineGraph,
-    ToUndirected,
-)
-from torch_geometric.utils import to_networkx, to_undirected
 
 from src import CONFIGS_PATH
 from src.config.config import Config
-from src.plotting.utils import set_rcParams
+from src.environment.factory import make_environment
+from src.graph.positional_encodings import (
+    GraphType,
+    edge_average_encoding,
+    laplacian_positional_encodings,
+    substation_graph_edge_index,
+)
 
 
 def normalize_positions(pos: dict[Any, tuple[float, float]]) -> dict[Any, tuple[float, float]]:
@@ -65,23 +59,32 @@ def main(cfg: Config):
     Returns
     -------
     """
+    # the plotting stack is only imported once the config is composed, so --help and --cfg job return right away
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    import networkx as nx  # pylint: disable=import-outside-toplevel
+
+    from src.plotting.utils import (  # pylint: disable=import-outside-toplevel
+        set_rcParams,
+    )
+
     set_rcParams(cfg)
-    seed_everything(cfg.random_seed)
+    random.seed(cfg.random_seed)
+    np.random.seed(cfg.random_seed)
     num_components = cfg.positional_encodings.num_components
 
-    environment = grid2op.make(cfg.environment.name)
-
-    edge_index = np.concatenate(
-        (environment.line_or_to_subid.reshape(1, -1), environment.line_ex_to_subid.reshape(1, -1)), axis=0
-    )
-    edge_index = to_undirected(torch.LongTensor(edge_index))
+    environment = make_environment(cfg.environment)
 
-    pyg_graph = Data(edge_index=edge_index, num_nodes=environment.n_sub)
-    pyg_graph = AddLaplacianEigenvectorPE(k=num_components)(pyg_graph)
-    nx_graph = to_networkx(pyg_graph)
+    # one edge per line; the encodings are cached on disk, so they're only computed once per grid
+    edge_index = substation_graph_edge_index(environment)
+    edge_list = [tuple(edge) for edge in edge_index.T.tolist()]
+    nx_graph = nx.Graph()
+    nx_graph.add_nodes_from(range(environment.n_sub))
+    nx_graph.add_edges_from(edge_list)
 
-    pyg_line_graph = Compose([LineGraph(force_directed=True), ToUndirected()])(pyg_graph)
-    pyg_line_graph = AddLaplacianEigenvectorPE(k=num_components)(pyg_line_graph)
+    solver = cfg.positional_encodings.solver
+    node_encodings = laplacian_positional_encodings(environment, num_components, GraphType.SUBSTATION, solver)
+    line_graph_encodings = laplacian_positional_encodings(environment, num_components, GraphType.LINE, solver)
+    edge_averages = edge_average_encoding(node_encodings, edge_index)
 
     pos = {
         substation_id: substation_pos for substation_id, substation_pos in enumerate(environment.grid_layout.values())
@@ -97,12 +100,11 @@ def main(cfg: Config):
 
         # laplacian eigenvectors on a node level
         ax_graph = axs[0, i] if num_components > 1 else axs[0]
-        laplacian_eigenvector = pyg_graph.laplacian_eigenvector_pe.numpy()[:, i]
+        laplacian_eigenvector = node_encodings[:, i]
         nx.draw_networkx(
             nx_graph,
             pos,
             ax=ax_graph,
-            arrows=False,
             node_color=laplacian_eigenvector,
             vmin=laplacian_eigenvector.min(),
             vmax=laplacian_eigenvector.max(),
@@ -114,12 +116,12 @@ def main(cfg: Config):
 
         # laplacian eigenvectors of the line graph
         ax_line_graph = axs[1, i] if num_components > 1 else axs[1]
-        line_graph_laplacian_eigenvector = pyg_line_graph.laplacian_eigenvector_pe.numpy()[:, i]
+        line_graph_laplacian_eigenvector = line_graph_encodings[:, i]
         nx.draw_networkx(
             nx_graph,
             pos,
             ax=ax_line_graph,
-            arrows=False,
+            edgelist=edge_list,
             node_color="black",
             edge_color=line_graph_laplacian_eigenvector,
             edge_vmin=line_graph_laplacian_eigenvector.min(),
@@ -136,20 +138,12 @@ def main(cfg: Config):
         # average of adjacent node level laplacian eigenvectors
         ax_line_average = axs[2, i] if num_components > 1 else axs[2]
 
-        line_average_eigenvector = []
-        for edge_idx in range(pyg_graph.num_edges):
-            source_node = pyg_graph.edge_index[0][edge_idx].item()
-            target_node = pyg_graph.edge_index[1][edge_idx].item()
-            line_average_eigenvector.append(
-                (laplacian_eigenvector[source_node] + laplacian_eigenvector[target_node]) / 2
-            )
-
-        line_average_eigenvector = np.array(line_average_eigenvector)
+        line_average_eigenvector = edge_averages[:, i]
         nx.draw_networkx(
             nx_graph,
             pos,
             ax=ax_line_average,
-            arrows=False,
+            edgelist=edge_list,
             node_color="black",
             edge_color=line_average_eigenvector,
             edge_vmin=line_average_eigenvector.min(),
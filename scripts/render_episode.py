@@ -0,0 +1,42 @@
+import hydra
+import numpy as np
+
+from src import CONFIGS_PATH, DATA_DIR
+from src.config.config import Config
+from src.game.recorder import EPISODES_DIR, EpisodeReader
+from src.plotting.batch_rendering import render_episode
+
+RENDERS_DIR = DATA_DIR / "renders"
+
+
+@hydra.main(version_base=None, config_path=str(CONFIGS_PATH), config_name="default")
+def main(cfg: Config):
+    """
+    Render a recorded episode to image files, one per step, in parallel.
+
+    Parameters
+    ----------
+    cfg: Config
+        Config.
+
+    Returns
+    -------
+    """
+    episode_directory = EPISODES_DIR / cfg.rendering.episode_name
+    output_directory = RENDERS_DIR / cfg.rendering.episode_name
+
+    num_steps = len(EpisodeReader(episode_directory))
+    frame_paths, frames_per_second = render_episode(
+        cfg,
+        episode_directory,
+        output_directory,
+        steps=np.arange(0, num_steps, cfg.rendering.stride),
+        file_format=cfg.rendering.file_format,
+        num_workers=cfg.rendering.num_workers,
+    )
+
+    print(f"Rendered {len(frame_paths)} frames to {output_directory} at {frames_per_second:.1f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
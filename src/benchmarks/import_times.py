@@ -0,0 +1,156 @@
+import subprocess
+import sys
+from collections import Counter
+from dataclasses import dataclass
+
+from src import PROJECT_ROOT
+
+IMPORT_TIME_PREFIX = "import time:"
+
+
+@dataclass
+class ImportRecord:
+    """One line of the `python -X importtime` output. Times are in seconds."""
+
+    name: str
+    self_time: float
+    cumulative_time: float
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".")[0]
+
+
+def parse_import_times(output: str) -> list[ImportRecord]:
+    """
+    Parse the output of `python -X importtime`, i.e., lines of the form
+    `import time: <self [us]> | <cumulative [us]> | <indentation><module name>`.
+
+    Parameters
+    ----------
+    output: str
+        Standard error of the Python process.
+
+    Returns
+    -------
+    records: list[ImportRecord]
+        Import records, in the order in which the imports finished.
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX) or "self [us]" in line:
+            continue
+
+        self_time, cumulative_time, name = line[len(IMPORT_TIME_PREFIX) :].split("|")
+        records.append(
+            ImportRecord(
+                name=name.strip(),
+                self_time=int(self_time) / 1e6,
+                cumulative_time=int(cumulative_time) / 1e6,
+                # the top-level imports are indented by one space, every level deeper by two more
+                depth=(len(name) - len(name.lstrip()) - 1) // 2,
+            )
+        )
+
+    return records
+
+
+def measure_import_times(module: str) -> list[ImportRecord]:
+    """
+    Import a module in a fresh Python process with `-X importtime`, so that nothing is imported already.
+
+    Parameters
+    ----------
+    module: str
+        Module name, e.g., src.game.game.
+
+    Returns
+    -------
+    records: list[ImportRecord]
+        Import records.
+
+    Raises
+    ------
+    RuntimeError
+        If the module can't be imported.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        check=False,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr[-2000:]}")
+
+    return parse_import_times(process.stderr)
+
+
+def total_import_time(records: list[ImportRecord]) -> float:
+    """
+    Get the total import time, i.e., the sum of the self times of all the imported modules.
+
+    Parameters
+    ----------
+    records: list[ImportRecord]
+        Import records.
+
+    Returns
+    -------
+    total_time: float
+        Total import time in seconds.
+    """
+    return sum(record.self_time for record in records)
+
+
+def import_time_per_package(records: list[ImportRecord]) -> Counter:
+    """
+    Get the import time of every top-level package, i.e., the sum of the self times of its modules, so that the time of
+    a package isn't counted again for every package that imports it.
+
+    Parameters
+    ----------
+    records: list[ImportRecord]
+        Import records.
+
+    Returns
+    -------
+    package_times: Counter
+        Import time in seconds of every package.
+    """
+    package_times = Counter()
+    for record in records:
+        package_times[record.package] += record.self_time
+
+    return package_times
+
+
+def format_import_report(module_records: dict[str, list[ImportRecord]], num_packages: int = 5) -> str:
+    """
+    Format a report of the total import time of every module and of the packages that take the longest to import.
+
+    Parameters
+    ----------
+    module_records: dict[str, list[ImportRecord]]
+        Import records of every module.
+    num_packages: int
+        Number of packages listed per module.
+
+    Returns
+    -------
+    report: str
+        Report.
+    """
+    name_width = max(len(module) for module in module_records)
+
+    lines = []
+    for module, records in sorted(module_records.items(), key=lambda item: -total_import_time(item[1])):
+        heaviest_packages = ", ".join(
+            f"{package} {package_time:.2f}"
+            for package, package_time in import_time_per_package(records).most_common(num_packages)
+        )
+        lines.append(f"{module:{name_width}}  {total_import_time(records):6.2f} s  ({heaviest_packages})")
+
+    return "\n".join(lines)
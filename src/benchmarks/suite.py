@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import platform
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+from src import DATA_DIR
+from src.config.environment.environment import EnvironmentConfig
+from src.environment.factory import make_environment
+from src.game.action_builder import ElementType
+from src.game.game import Game
+from src.graph.positional_encodings import GraphType, laplacian_positional_encodings
+
+if TYPE_CHECKING:
+    from src.game.menu.menu import Menu
+
+BENCHMARKS_DIR = DATA_DIR / "benchmarks"
+
+
+@dataclass
+class BenchmarkResult:
+    """Result of one benchmark on one environment."""
+
+    name: str
+    environment_name: str
+    value: float
+    unit: str
+    higher_is_better: bool = False
+
+    @property
+    def key(self) -> str:
+        return f"{self.environment_name}/{self.name}"
+
+
+@dataclass
+class Regression:
+    """A benchmark that got worse than its baseline by more than the tolerance."""
+
+    key: str
+    baseline: float
+    value: float
+    unit: str
+
+
+def time_function(function: Callable[[], object], repeats: int = 5, number: int = 1) -> float:
+    """
+    Time a function, same as `timeit`: the function is called number times in a row, repeats times, and the fastest of
+    the repeats is kept, since the slower ones are slowed down by other processes rather than by the function.
+
+    Parameters
+    ----------
+    function: Callable[[], object]
+        Function to time.
+    repeats: int
+        Number of repeats.
+    number: int
+        Number of calls per repeat.
+
+    Returns
+    -------
+    seconds: float
+        Seconds per call.
+    """
+    times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start_time) / number)
+
+    return min(times)
+
+
+def benchmark_continue_simulation(game: Game, num_steps: int, repeats: int) -> float:
+    """
+    Measure the simulation throughput of `Game.continue_simulation` from the start of the first chronics. The simulation
+    stops at the first overload or after num_steps steps, whichever comes first.
+
+    Parameters
+    ----------
+    game: Game
+        Game.
+    num_steps: int
+        Maximum number of steps.
+    repeats: int
+        Number of repeats.
+
+    Returns
+    -------
+    steps_per_second: float
+        Fastest throughput of the repeats.
+    """
+    steps_per_second = []
+    for _ in range(repeats):
+        game.seek(chronics_id=0)
+
+        simulated_steps = [0]
+
+        def count_steps(steps: int):
+            simulated_steps[0] = steps
+
+        try:
+            game.continue_simulation(
+                {}, progress_interval=None, should_stop=lambda: simulated_steps[0] >= num_steps, callback=count_steps
+            )
+        except RuntimeError:
+            # the episode ended, the throughput up to that point is still valid
+            pass
+
+        steps_per_second.append(game.steps_per_second)
+
+    game.seek(chronics_id=0)
+
+    return max(steps_per_second)
+
+
+def benchmark_lookups(game: Game, repeats: int) -> dict[str, float]:
+    """
+    Measure the latency of the lookups done by the menu, i.e., the line ID of a substation and line destination pair,
+    and setting the busbar of an element in the action builder.
+
+    Parameters
+    ----------
+    game: Game
+        Game.
+    repeats: int
+        Number of repeats.
+
+    Returns
+    -------
+    seconds: dict[str, float]
+        Seconds per lookup of each lookup type.
+    """
+    topology = game.topology
+    line_keys = list(topology.line_ids)
+    line_or_busbars = game.observation.line_or_bus
+    action_builder = game.action_builder
+
+    def get_line_ids():
+        for substation_id, line_destination in line_keys:
+            topology.get_line_id(substation_id, line_destination)
+
+    def set_busbars():
+        for line_idx in range(len(line_or_busbars)):
+            action_builder.set_busbar(ElementType.LINE_OR, line_idx, 2, line_or_busbars)
+
+    seconds = {
+        "get_line_id": time_function(get_line_ids, repeats) / len(line_keys),
+        "set_busbar": time_function(set_busbars, repeats) / len(line_or_busbars),
+    }
+    action_builder.clear()
+
+    return seconds
+
+
+def benchmark_print_action_dict(game: Game, repeats: int) -> dict[str, float]:
+    """
+    Measure how long it takes to print the topology table and the action dictionary, as text and as HTML. The output is
+    discarded.
+
+    Parameters
+    ----------
+    game: Game
+        Game.
+    repeats: int
+        Number of repeats.
+
+    Returns
+    -------
+    seconds: dict[str, float]
+        Seconds per call of each format.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            "print_action_dict_text": time_function(game.print_action_dict, repeats, number=10),
+            "print_action_dict_html": time_function(lambda: game.print_action_dict(html=True), repeats, number=10),
+        }
+
+
+def benchmark_apply_action(menu: Menu, repeats: int) -> float:
+    """
+    Measure the latency of previewing an action from the menu, including plotting the differences. Outside a notebook,
+    the output widgets print to the standard output, which is discarded.
+
+    Parameters
+    ----------
+    menu: Menu
+        Menu.
+    repeats: int
+        Number of repeats.
+
+    Returns
+    -------
+    seconds: float
+        Seconds per preview.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return time_function(menu.apply_action, repeats)
+
+
+def benchmark_render(game: Game, repeats: int) -> float:
+    """
+    Measure how long it takes to update the grid renderer with an observation and draw the figure.
+
+    Parameters
+    ----------
+    game: Game
+        Game.
+    repeats: int
+        Number of repeats.
+
+    Returns
+    -------
+    seconds: float
+        Seconds per frame.
+    """
+    renderer = game.renderer
+
+    def render():
+        renderer.update(game.observation, "Benchmark", redraw=False)
+        renderer.figure.canvas.draw()
+
+    return time_function(render, repeats)
+
+
+def run_benchmarks(
+    environment_config: EnvironmentConfig, num_steps: int = 100, repeats: int = 5, num_eigenvectors: int = 3
+) -> list[BenchmarkResult]:
+    """
+    Run all the benchmarks on an environment.
+
+    Parameters
+    ----------
+    environment_config: EnvironmentConfig
+        Environment config.
+    num_steps: int
+        Maximum number of steps of the simulation benchmark.
+    repeats: int
+        Number of repeats of every benchmark.
+    num_eigenvectors: int
+        Number of eigenvectors of the positional encodings.
+
+    Returns
+    -------
+    results: list[BenchmarkResult]
+        Benchmark results.
+    """
+    # the menu needs ipywidgets, which is only imported for this benchmark
+    from src.game.menu.menu import Menu  # pylint: disable=import-outside-toplevel
+
+    environment = make_environment(environment_config)
+    game = Game(environment, chronics_id=0)
+
+    def result(name: str, value: float, unit: str = "s", higher_is_better: bool = False) -> BenchmarkResult:
+        return BenchmarkResult(name, environment_config.name, float(value), unit, higher_is_better)
+
+    results = [result("continue_simulation", benchmark_continue_simulation(game, num_steps, repeats), "steps/s", True)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        menu = Menu(game, continue_simulation=False, run_in_background=False)
+    results.append(result("apply_action", benchmark_apply_action(menu, repeats)))
+
+    results.extend(result(name, seconds) for name, seconds in benchmark_lookups(game, repeats).items())
+    results.extend(result(name, seconds) for name, seconds in benchmark_print_action_dict(game, repeats).items())
+    results.append(result("render", benchmark_render(game, repeats)))
+
+    for graph_type in GraphType:
+        seconds = time_function(
+            lambda: laplacian_positional_encodings(environment, num_eigenvectors, graph_type, directory=None), repeats
+        )
+        results.append(result(f"positional_encodings_{graph_type}", seconds))
+
+    return results
+
+
+def save_results(results: list[BenchmarkResult], path: Path):
+    """
+    Save benchmark results to a JSON file, along with information about the machine they were measured on.
+
+    Parameters
+    ----------
+    results: list[BenchmarkResult]
+        Benchmark results.
+    path: Path
+        JSON file path.
+
+    Returns
+    -------
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    report = {
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "numpy": np.__version__},
+        "results": [asdict(result) for result in results],
+    }
+    with open(path, "w", encoding="UTF-8") as file:
+        json.dump(report, file, indent=4)
+
+
+def load_results(path: Path) -> list[BenchmarkResult]:
+    """
+    Load benchmark results saved by `save_results`.
+
+    Parameters
+    ----------
+    path: Path
+        JSON file path.
+
+    Returns
+    -------
+    results: list[BenchmarkResult]
+        Benchmark results.
+    """
+    with open(path, "r", encoding="UTF-8") as file:
+        return [BenchmarkResult(**result) for result in json.load(file)["results"]]
+
+
+def find_regressions(
+    results: list[BenchmarkResult], baseline: list[BenchmarkResult], tolerance: float = 0.2
+) -> list[Regression]:
+    """
+    Compare benchmark results against a baseline. Benchmarks missing from the baseline are skipped.
+
+    Parameters
+    ----------
+    results: list[BenchmarkResult]
+        Benchmark results.
+    baseline: list[BenchmarkResult]
+        Baseline results, e.g., of the main branch.
+    tolerance: float
+        Relative slowdown that is tolerated, e.g., 0.2 for 20 %. Timings are noisy, so it shouldn't be too small.
+
+    Returns
+    -------
+    regressions: list[Regression]
+        Benchmarks that got worse than the baseline by more than the tolerance.
+    """
+    baseline_values = {result.key: result.value for result in baseline}
+
+    regressions = []
+    for result in results:
+        if result.key not in baseline_values:
+            continue
+
+        # compare durations, so that a throughput that halves counts the same as a duration that doubles
+        baseline_value = baseline_values[result.key]
+        if result.higher_is_better:
+            slowdown = baseline_value / result.value if result.value > 0 else np.inf
+        else:
+            slowdown = result.value / baseline_value if baseline_value > 0 else 1.0
+
+        if slowdown > 1.0 + tolerance:
+            regressions.append(Regression(result.key, baseline_value, result.value, result.unit))
+
+    return regressions
+
+
+def format_results(results: list[BenchmarkResult], baseline: list[BenchmarkResult] | None = None) -> str:
+    """
+    Format benchmark results as a table, with the relative change to the baseline if given.
+
+    Parameters
+    ----------
+    results: list[BenchmarkResult]
+        Benchmark results.
+    baseline: list[BenchmarkResult] | None
+        Baseline results.
+
+    Returns
+    -------
+    table: str
+        Table.
+    """
+    baseline_values = {} if baseline is None else {result.key: result.value for result in baseline}
+    key_width = max(len(result.key) for result in results)
+
+    lines = []
+    for result in results:
+        value = f"{result.value:.3g} {result.unit}" if result.unit != "s" else f"{result.value * 1e3:.3g} ms"
+        line = f"{result.key:{key_width}}  {value:>14}"
+
+        if result.key in baseline_values and baseline_values[result.key] > 0:
+            line += f"  {result.value / baseline_values[result.key] - 1.0:+.0%}"
+
+        lines.append(line)
+
+    return "\n".join(lines)
@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class BenchmarkConfig:
+    environment_names: list[str] = field(default_factory=lambda: ["l2rpn_case14_sandbox", "l2rpn_wcci_2022"])
+    test: bool = True  # the test versions of the environments ship with grid2op, so the benchmarks run offline
+    num_steps: int = 100
+    repeats: int = 5
+    num_eigenvectors: int = 3
+    results_name: str = "latest"
+    baseline_name: str | None = None
+    tolerance: float = 0.2
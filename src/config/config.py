@@ -2,18 +2,26 @@ from dataclasses import dataclass, field
 
 from hydra.core.config_store import ConfigStore
 
+from src.config.benchmark.benchmark import BenchmarkConfig
+from src.config.dataset.dataset import DatasetConfig
 from src.config.environment.environment import EnvironmentConfig
+from src.config.import_times.import_times import ImportTimesConfig
 from src.config.plotting.plotting import PlottingConfig
 from src.config.positional_encodings.positional_encodings import (
     PositionalEncodingsConfig,
 )
+from src.config.rendering.rendering import RenderingConfig
 
 
 @dataclass
 class Config:
+    benchmark: BenchmarkConfig = field(default_factory=BenchmarkConfig)
+    dataset: DatasetConfig = field(default_factory=DatasetConfig)
     environment: EnvironmentConfig = field(default_factory=EnvironmentConfig)
+    import_times: ImportTimesConfig = field(default_factory=ImportTimesConfig)
     plotting: PlottingConfig = field(default_factory=PlottingConfig)
     positional_encodings: PositionalEncodingsConfig = field(default_factory=PositionalEncodingsConfig)
+    rendering: RenderingConfig = field(default_factory=RenderingConfig)
 
     random_seed: int = 42
 
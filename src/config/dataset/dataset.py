@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class DatasetConfig:
+    name: str = "overload_scenarios"
+    num_rollouts: int = 1024
+    shard_size: int = 256
+    num_workers: int | None = None
+    random_start: bool = True
+    max_steps: int | None = None
@@ -4,3 +4,5 @@ from dataclasses import dataclass
 @dataclass
 class EnvironmentConfig:
     name: str = "l2rpn_case14_sandbox"
+    test: bool = False  # use the small test version of the dataset that ships with grid2op, i.e., no download needed
+    cache_chronics: bool = False  # load all the chronics into memory once, shared with the forked worker processes
@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ImportTimesConfig:
+    modules: list[str] = field(
+        default_factory=lambda: [
+            "src.game.game",
+            "src.game.menu.menu",
+            "src.game.pool",
+            "src.game.recorder",
+            "src.graph.positional_encodings",
+            "src.graph.features",
+            "src.dataset.shards",
+            "src.plotting.batch_rendering",
+            "scripts.positional_encodings",
+            "scripts.generate_dataset",
+            "scripts.render_episode",
+        ]
+    )
+    num_packages: int = 5
+    max_seconds: float | None = None
@@ -11,3 +11,4 @@ class LineGraphConfig:
 class PositionalEncodingsConfig:
     line_graph: LineGraphConfig = field(default_factory=LineGraphConfig)
     num_components: int = 3
+    solver: str = "auto"
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class RenderingConfig:
+    episode_name: str = "episode"
+    file_format: str = "png"
+    num_workers: int | None = None
+    stride: int = 1
@@ -0,0 +1,108 @@
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+from src.dataset.shards import (
+    SCENARIO_FIELDS,
+    extract_shard,
+    get_extracted_path,
+    read_index,
+)
+
+
+class OverloadScenarioDataset(Dataset):
+    """
+    Dataset of the overload scenarios written by `scripts/generate_dataset.py`, i.e., the first states of rollouts in
+    which any of the lines become overloaded, same as where `Game.continue_simulation` stops.
+
+    The shards are read lazily: the first time a sample of a shard is accessed, the shard is extracted into uncompressed
+    .npy files next to it, which are memory-mapped from then on. The dataset therefore never has to fit into memory,
+    and the extraction only happens once per shard, even across runs.
+    """
+
+    def __init__(self, directory: Path, fields: tuple[str, ...] = SCENARIO_FIELDS):
+        """
+        Parameters
+        ----------
+        directory: Path
+            Dataset directory.
+        fields: tuple[str, ...]
+            Fields of the samples.
+        """
+        self.directory = Path(directory)
+        self.fields = fields
+
+        index = read_index(self.directory)
+        self.metadata = index["metadata"]
+        self.shard_offsets = np.cumsum([0] + index["shard_lengths"])
+
+        missing_fields = set(fields) - set(index["fields"])
+        if missing_fields:
+            raise ValueError(f"Fields {sorted(missing_fields)} aren't in the dataset {self.directory}")
+
+        # memory maps are opened per process, so that the dataset can be pickled into data loader workers
+        self.shards: dict[int, dict[str, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return int(self.shard_offsets[-1])
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "shards": {}}
+
+    def get_shard(self, shard_idx: int) -> dict[str, np.ndarray]:
+        """
+        Get the memory maps of the fields of a shard, extracting the shard first if needed.
+
+        Parameters
+        ----------
+        shard_idx: int
+            Shard index.
+
+        Returns
+        -------
+        shard: dict[str, np.ndarray]
+            Read-only memory map of each field.
+        """
+        if shard_idx not in self.shards:
+            extract_shard(self.directory, shard_idx, list(self.fields))
+            self.shards[shard_idx] = {
+                field: np.load(get_extracted_path(self.directory, shard_idx, field), mmap_mode="r")
+                for field in self.fields
+            }
+
+        return self.shards[shard_idx]
+
+    def __getitem__(self, idx: int) -> dict[str, torch.Tensor | str]:
+        """
+        Get a sample.
+
+        Parameters
+        ----------
+        idx: int
+            Sample index.
+
+        Returns
+        -------
+        sample: dict[str, torch.Tensor | str]
+            Value of each field. Strings, i.e., the chronics IDs, are returned as they are.
+
+        Raises
+        ------
+        IndexError
+            If the index is out of range.
+        """
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Index {idx} is out of range for a dataset with {len(self)} samples")
+
+        shard_idx = int(np.searchsorted(self.shard_offsets, idx, side="right") - 1)
+        shard = self.get_shard(shard_idx)
+        row = idx - self.shard_offsets[shard_idx]
+
+        sample = {}
+        for field, values in shard.items():
+            value = values[row]
+            sample[field] = str(value) if values.dtype.kind == "U" else torch.as_tensor(np.array(value))
+
+        return sample
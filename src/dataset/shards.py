@@ -0,0 +1,236 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from src import DATA_DIR
+
+DATASETS_DIR = DATA_DIR / "datasets"
+INDEX_FILENAME = "index.json"
+EXTRACTED_DIRNAME = "extracted"
+
+# fields of the overload scenarios, kept here so that writing a dataset doesn't import torch
+SCENARIO_FIELDS = ("observations", "rewards", "cumulative_rewards", "start_steps", "stop_steps", "chronics_ids")
+
+
+def get_shard_path(directory: Path, shard_idx: int) -> Path:
+    """
+    Get the path of a compressed shard.
+
+    Parameters
+    ----------
+    directory: Path
+        Dataset directory.
+    shard_idx: int
+        Shard index.
+
+    Returns
+    -------
+    shard_path: Path
+        Shard path.
+    """
+    return directory / f"shard_{shard_idx:05d}.npz"
+
+
+def get_extracted_path(directory: Path, shard_idx: int, field: str) -> Path:
+    """
+    Get the path of a field of a shard extracted into an uncompressed .npy file.
+
+    Parameters
+    ----------
+    directory: Path
+        Dataset directory.
+    shard_idx: int
+        Shard index.
+    field: str
+        Field name.
+
+    Returns
+    -------
+    extracted_path: Path
+        Path of the extracted field.
+    """
+    return directory / EXTRACTED_DIRNAME / f"{field}_{shard_idx:05d}.npy"
+
+
+class ShardWriter:
+    """
+    Writes samples into compressed shards of a fixed number of samples. The samples are buffered until a shard is full,
+    so only one shard is held in memory, and an index file keeps track of the shards, their lengths and the fields.
+
+    A dataset that already exists under the same name is deleted first, i.e., its shards, its index and the fields
+    extracted from its shards. Otherwise, readers would keep memory-mapping the fields extracted from the old shards.
+    """
+
+    def __init__(self, name: str, shard_size: int = 1024, directory: Path = DATASETS_DIR, metadata: dict | None = None):
+        """
+        Parameters
+        ----------
+        name: str
+            Name of the dataset, i.e., of its directory.
+        shard_size: int
+            Number of samples per shard. Only the last shard can be shorter.
+        directory: Path
+            Directory in which the dataset directory is created.
+        metadata: dict | None
+            JSON serializable information stored in the index, e.g., the environment name.
+        """
+        self.directory = directory / name
+        self.clear()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.shard_size = shard_size
+        self.metadata = {} if metadata is None else metadata
+
+        self.shard_lengths: list[int] = []
+        self.buffer: dict[str, list[np.ndarray]] = {}
+        self.buffer_length = 0
+
+    def clear(self):
+        """
+        Delete the shards, the index and the extracted fields of a previous dataset in the dataset directory.
+
+        Returns
+        -------
+        """
+        if not self.directory.exists():
+            return
+
+        shutil.rmtree(self.directory / EXTRACTED_DIRNAME, ignore_errors=True)
+        for shard_path in self.directory.glob("shard_*.npz"):
+            shard_path.unlink()
+        (self.directory / INDEX_FILENAME).unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(self.shard_lengths) + self.buffer_length
+
+    def append(self, samples: dict[str, np.ndarray]):
+        """
+        Append a batch of samples, writing every shard that fills up.
+
+        Parameters
+        ----------
+        samples: dict[str, np.ndarray]
+            Samples, the i-th row of each array belongs to the i-th sample.
+
+        Returns
+        -------
+        """
+        for field, values in samples.items():
+            self.buffer.setdefault(field, []).append(np.asarray(values))
+        self.buffer_length += len(next(iter(samples.values())))
+
+        while self.buffer_length >= self.shard_size:
+            self.write_shard(self.shard_size)
+
+    def write_shard(self, num_samples: int):
+        """
+        Write the first num_samples buffered samples into a new shard and update the index.
+
+        Parameters
+        ----------
+        num_samples: int
+            Number of samples of the shard.
+
+        Returns
+        -------
+        """
+        shard = {}
+        for field, values in self.buffer.items():
+            values = np.concatenate(values)
+            shard[field] = values[:num_samples]
+            self.buffer[field] = [values[num_samples:]]
+
+        np.savez_compressed(get_shard_path(self.directory, len(self.shard_lengths)), **shard)
+        self.shard_lengths.append(num_samples)
+        self.buffer_length -= num_samples
+
+        self.write_index()
+
+    def write_index(self):
+        """
+        Write the index file.
+
+        Returns
+        -------
+        """
+        index = {
+            "shard_size": self.shard_size,
+            "num_samples": sum(self.shard_lengths),
+            "shard_lengths": self.shard_lengths,
+            "fields": list(self.buffer),
+            "metadata": self.metadata,
+        }
+        with open(self.directory / INDEX_FILENAME, "w", encoding="UTF-8") as file:
+            json.dump(index, file, indent=4)
+
+    def close(self):
+        """
+        Write the remaining buffered samples into a last, shorter shard and the index.
+
+        Returns
+        -------
+        """
+        if self.buffer_length > 0:
+            self.write_shard(self.buffer_length)
+        else:
+            self.write_index()
+
+
+def read_index(directory: Path) -> dict:
+    """
+    Read the index of a dataset.
+
+    Parameters
+    ----------
+    directory: Path
+        Dataset directory.
+
+    Returns
+    -------
+    index: dict
+        Index.
+    """
+    with open(Path(directory) / INDEX_FILENAME, "r", encoding="UTF-8") as file:
+        return json.load(file)
+
+
+def extract_shard(directory: Path, shard_idx: int, fields: list[str]):
+    """
+    Extract the fields of a compressed shard into uncompressed .npy files, so that they can be memory-mapped. Fields
+    that have already been extracted are skipped. Every file is written under a temporary name and renamed when it's
+    complete, so concurrent extractions, e.g., by data loader workers, never read a partially written file.
+
+    Parameters
+    ----------
+    directory: Path
+        Dataset directory.
+    shard_idx: int
+        Shard index.
+    fields: list[str]
+        Fields to extract.
+
+    Returns
+    -------
+    """
+    missing_fields = [field for field in fields if not get_extracted_path(directory, shard_idx, field).exists()]
+    if not missing_fields:
+        return
+
+    (directory / EXTRACTED_DIRNAME).mkdir(exist_ok=True)
+    with np.load(get_shard_path(directory, shard_idx)) as shard:
+        for field in missing_fields:
+            extracted_path = get_extracted_path(directory, shard_idx, field)
+            temporary_path = extracted_path.with_suffix(f".{os.getpid()}.tmp")
+
+            with open(temporary_path, "wb") as file:
+                np.save(file, shard[field])
+            os.replace(temporary_path, extracted_path)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from src.config.environment.environment import EnvironmentConfig
+
+if TYPE_CHECKING:
+    from grid2op.Environment import Environment
+
+# environments built by this process, or inherited from the parent process when forked
+_environments: dict[tuple[str, bool, bool], Environment] = {}
+
+
+def get_environment_key(environment_config: EnvironmentConfig) -> tuple[str, bool, bool]:
+    """
+    Get the key of an environment config. Works for the structured config as well as for the DictConfig created by
+    hydra, which aren't hashable.
+
+    Parameters
+    ----------
+    environment_config: EnvironmentConfig
+        Environment config.
+
+    Returns
+    -------
+    key: tuple[str, bool, bool]
+        Name, test flag and chronics cache flag.
+    """
+    return environment_config.name, bool(environment_config.test), bool(environment_config.cache_chronics)
+
+
+def build_environment(environment_config: EnvironmentConfig) -> Environment:
+    """
+    Build a new environment. With the chronics cache enabled, all the chronics are loaded into memory right away, so
+    resets don't read them from disk.
+
+    Parameters
+    ----------
+    environment_config: EnvironmentConfig
+        Environment config.
+
+    Returns
+    -------
+    environment: Environment
+        Environment.
+    """
+    # grid2op takes seconds to import, so only the processes that build an environment import it
+    import grid2op  # pylint: disable=import-outside-toplevel
+    from grid2op.Chronics import (  # pylint: disable=import-outside-toplevel
+        MultifolderWithCache,
+    )
+
+    if not environment_config.cache_chronics:
+        return grid2op.make(environment_config.name, test=environment_config.test)
+
+    environment = grid2op.make(
+        environment_config.name, test=environment_config.test, chronics_class=MultifolderWithCache
+    )
+
+    # by default, the cache is empty until a filter is set and the chronics handler is reset
+    environment.chronics_handler.real_data.set_filter(lambda _: True)
+    environment.chronics_handler.real_data.reset()
+    environment.reset()
+
+    return environment
+
+
+def make_environment(environment_config: EnvironmentConfig) -> Environment:
+    """
+    Get the environment of a config, building it only the first time it's requested in this process. Later calls
+    return the same instance, so it's shared; use `clone_environment` to get one that can be stepped independently.
+
+    Processes forked after the environment is built inherit it, e.g., the workers of a ProcessPoolExecutor with the
+    default start method on Linux, so they get it for free instead of paying the cost of `grid2op.make` again, and the
+    cached chronics are shared with the parent process until they're written to.
+
+    Parameters
+    ----------
+    environment_config: EnvironmentConfig
+        Environment config.
+
+    Returns
+    -------
+    environment: Environment
+        Cached environment.
+    """
+    key = get_environment_key(environment_config)
+    if key not in _environments:
+        _environments[key] = build_environment(environment_config)
+
+    return _environments[key]
+
+
+def clone_environment(environment_config: EnvironmentConfig) -> Environment:
+    """
+    Get an independent copy of the cached environment of a config. Copying skips loading the grid, the chronics and
+    building the action and observation spaces, so it's much cheaper than `grid2op.make`.
+
+    Parameters
+    ----------
+    environment_config: EnvironmentConfig
+        Environment config.
+
+    Returns
+    -------
+    environment: Environment
+        Copy of the cached environment.
+    """
+    return make_environment(environment_config).copy()
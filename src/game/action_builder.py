@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from enum import StrEnum
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from grid2op.Environment import Environment
+
+
+class ElementType(StrEnum):
+    LINE_OR = "lines_or_id"
+    LINE_EX = "lines_ex_id"
+    GENERATOR = "generators_id"
+    LOAD = "loads_id"
+    STORAGE = "storages_id"
+
+
+class ActionBuilder:
+    """
+    Builds a set_bus action element by element. The busbar of every element is stored in an int8 array per element
+    type, where 0 means that the element is untouched, so setting or reading the busbar of an element takes constant
+    time. The grid2op action dictionary is only rebuilt for the element types that changed since it was last emitted.
+    """
+
+    def __init__(self, environment: Environment):
+        element_counts = {
+            ElementType.LINE_OR: environment.n_line,
+            ElementType.LINE_EX: environment.n_line,
+            ElementType.GENERATOR: environment.n_gen,
+            ElementType.LOAD: environment.n_load,
+            ElementType.STORAGE: environment.n_storage,
+        }
+        # storage units are only part of the action if the grid has any
+        self.element_types = [element_type for element_type, count in element_counts.items() if count > 0]
+
+        self.busbars = {element_type: np.zeros(element_counts[element_type], dtype=np.int8) for element_type in self}
+        self.pos_topo_vect = {
+            ElementType.LINE_OR: environment.line_or_pos_topo_vect,
+            ElementType.LINE_EX: environment.line_ex_pos_topo_vect,
+            ElementType.GENERATOR: environment.gen_pos_topo_vect,
+            ElementType.LOAD: environment.load_pos_topo_vect,
+            ElementType.STORAGE: environment.storage_pos_topo_vect,
+        }
+
+        self.set_bus_vector = np.zeros(environment.dim_topo, dtype=np.int8)
+        self.action_lists = {element_type: [] for element_type in self}
+        self.dirty = {element_type: False for element_type in self}
+
+    def __iter__(self):
+        return iter(self.element_types)
+
+    def clear(self):
+        """
+        Mark all the elements as untouched.
+
+        Returns
+        -------
+        """
+        for element_type in self:
+            self.busbars[element_type][:] = 0
+            self.dirty[element_type] = True
+
+    def is_empty(self) -> bool:
+        """
+        Check if no element is acted upon.
+
+        Returns
+        -------
+        empty: bool
+            True if all the elements are untouched.
+        """
+        return not any(self.busbars[element_type].any() for element_type in self)
+
+    def get_busbar(self, element_type: ElementType, element_idx: int, current_busbars: np.ndarray) -> int:
+        """
+        Get the busbar of an element. If the element is acted upon return the busbar after the action, otherwise return
+        its current busbar.
+
+        Parameters
+        ----------
+        element_type: ElementType
+            Element type.
+        element_idx: int
+            Element index.
+        current_busbars: np.ndarray
+            Current busbars of the elements of that type, e.g., read from the observation.
+
+        Returns
+        -------
+        busbar: int
+            Busbar.
+        """
+        busbar = self.busbars[element_type][element_idx]
+
+        return int(busbar) if busbar != 0 else int(current_busbars[element_idx])
+
+    def set_busbar(self, element_type: ElementType, element_idx: int, busbar: int, current_busbars: np.ndarray):
+        """
+        Set the busbar of an element. If the busbar is the same as the current one, the element is marked as untouched,
+        i.e., the action would just revert the element to its current state.
+
+        Parameters
+        ----------
+        element_type: ElementType
+            Element type.
+        element_idx: int
+            Element index.
+        busbar: int
+            New busbar.
+        current_busbars: np.ndarray
+            Current busbars of the elements of that type, e.g., read from the observation.
+
+        Returns
+        -------
+        """
+        self.busbars[element_type][element_idx] = 0 if current_busbars[element_idx] == busbar else busbar
+        self.dirty[element_type] = True
+
+    def to_dict(self) -> dict:
+        """
+        Get the grid2op action dictionary, i.e., lists of (element index, busbar) tuples per element type.
+
+        Returns
+        -------
+        action_dict: dict
+            Action dictionary.
+        """
+        for element_type in self:
+            if self.dirty[element_type]:
+                busbars = self.busbars[element_type]
+                self.action_lists[element_type] = [
+                    (int(element_idx), int(busbars[element_idx])) for element_idx in np.flatnonzero(busbars)
+                ]
+                self.dirty[element_type] = False
+
+        return {"set_bus": {element_type.value: list(self.action_lists[element_type]) for element_type in self}}
+
+    def to_set_bus_vector(self) -> np.ndarray:
+        """
+        Get the action as a set_bus vector over the whole topology vector, where 0 means no change. The vector is
+        preallocated and overwritten on every call, so copy it if it needs to outlive the next change.
+
+        Returns
+        -------
+        set_bus_vector: np.ndarray
+            Set bus vector.
+        """
+        for element_type in self:
+            self.set_bus_vector[self.pos_topo_vect[element_type]] = self.busbars[element_type]
+
+        return self.set_bus_vector
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import html
+import pprint
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from grid2op.Environment import Environment
+
+NAME_WIDTH = 20
+ID_WIDTH = 4
+SEPARATOR = "-" * 100
+
+
+def get_table_sections(environment: Environment) -> list[tuple[str, list[tuple[str, np.ndarray]]]]:
+    """
+    Get the sections of the topology table, i.e., for each element type the element IDs and the substations they're
+    connected to.
+
+    Parameters
+    ----------
+    environment: Environment
+        Environment.
+
+    Returns
+    -------
+    sections: list[tuple[str, list[tuple[str, np.ndarray]]]]
+        (ID row name, [(row name, row values)]) per element type.
+    """
+    return [
+        (
+            "Line ID",
+            [
+                ("line_or_to_subid", environment.line_or_to_subid),
+                ("line_ex_to_subid", environment.line_ex_to_subid),
+            ],
+        ),
+        ("Generator ID", [("gen_to_subid", environment.gen_to_subid)]),
+        ("Load ID", [("load_to_subid", environment.load_to_subid)]),
+    ]
+
+
+def format_text_row(name: str, values: np.ndarray) -> str:
+    """
+    Format a row of the text table, i.e., the name followed by the fixed-width values.
+
+    Parameters
+    ----------
+    name: str
+        Row name.
+    values: np.ndarray
+        Integer values.
+
+    Returns
+    -------
+    row: str
+        Formatted row.
+    """
+    return f"{name + ':':{NAME_WIDTH}}" + "".join(np.char.mod(f"%{ID_WIDTH}d", values))
+
+
+def format_text_table(environment: Environment) -> str:
+    """
+    Format the topology table as text, i.e., which substation every line, generator and load is connected to.
+
+    Parameters
+    ----------
+    environment: Environment
+        Environment.
+
+    Returns
+    -------
+    table: str
+        Text table.
+    """
+    table = []
+    for id_name, rows in get_table_sections(environment):
+        table.append(format_text_row(id_name, np.arange(len(rows[0][1]))) + "\n")
+        table.extend(format_text_row(name, values) for name, values in rows)
+        table.append(f"\n{SEPARATOR}")
+
+    return "\n".join(table) + "\n"
+
+
+def format_html_row(name: str, values: np.ndarray, cell_tag: str = "td") -> str:
+    """
+    Format a row of the HTML table.
+
+    Parameters
+    ----------
+    name: str
+        Row name.
+    values: np.ndarray
+        Integer values.
+    cell_tag: str
+        Tag of the value cells, e.g., th for a header row.
+
+    Returns
+    -------
+    row: str
+        HTML table row.
+    """
+    cells = np.char.add(np.char.add(f"<{cell_tag}>", values.astype(str)), f"</{cell_tag}>")
+
+    return f"<tr><th>{html.escape(name)}</th>{''.join(cells)}</tr>"
+
+
+def format_html_table(environment: Environment) -> str:
+    """
+    Format the topology table as HTML, one table per element type, scrollable horizontally for large grids.
+
+    Parameters
+    ----------
+    environment: Environment
+        Environment.
+
+    Returns
+    -------
+    table: str
+        HTML tables.
+    """
+    tables = []
+    for id_name, rows in get_table_sections(environment):
+        table_rows = [format_html_row(id_name, np.arange(len(rows[0][1])), cell_tag="th")]
+        table_rows.extend(format_html_row(name, values) for name, values in rows)
+        tables.append(f"<table>{''.join(table_rows)}</table>")
+
+    return f"<div style='overflow-x: auto'>{''.join(tables)}</div>"
+
+
+def format_selected_actions_html(action_dict: dict) -> str:
+    """
+    Format the selected actions as HTML.
+
+    Parameters
+    ----------
+    action_dict: dict
+        Action dictionary.
+
+    Returns
+    -------
+    selected_actions: str
+        HTML of the selected actions.
+    """
+    pp = pprint.PrettyPrinter(depth=10)
+
+    return f"<b>Selected actions:</b><pre>{html.escape(pp.pformat(action_dict))}</pre>"
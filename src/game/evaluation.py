@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from grid2op import Observation
+    from grid2op.Action import ActionSpace
+
+EVALUATION_DTYPE = np.dtype(
+    [
+        ("max_rho", np.float32),
+        ("reward", np.float32),
+        ("done", bool),
+        ("exception", "U128"),
+    ]
+)
+
+# the action space and the observation to evaluate the actions from, shared by all the actions evaluated by a worker
+_worker_state: tuple[ActionSpace, Observation] | None = None
+
+
+def _init_worker(action_space: ActionSpace, observation: Observation):
+    """
+    Initialize the state of a worker process.
+
+    Parameters
+    ----------
+    action_space: ActionSpace
+        Action space.
+    observation: Observation
+        Observation to evaluate the actions from.
+
+    Returns
+    -------
+    """
+    global _worker_state  # pylint: disable=global-statement
+    _worker_state = (action_space, observation)
+
+
+def _evaluate_chunk(actions: list[dict] | np.ndarray) -> np.ndarray:
+    """
+    Evaluate a chunk of actions from the observation of the worker.
+
+    Parameters
+    ----------
+    actions: list[dict] | np.ndarray
+        Action dictionaries or set_bus vectors.
+
+    Returns
+    -------
+    results: np.ndarray
+        Structured array of evaluation results.
+    """
+    return evaluate(*_worker_state, actions)
+
+
+def evaluate(action_space: ActionSpace, observation: Observation, actions: list[dict] | np.ndarray) -> np.ndarray:
+    """
+    Simulate each of the actions one step into the future from the given observation.
+
+    Parameters
+    ----------
+    action_space: ActionSpace
+        Action space.
+    observation: Observation
+        Observation to evaluate the actions from.
+    actions: list[dict] | np.ndarray
+        Action dictionaries, or set_bus vectors of shape (num_actions, dim_topo).
+
+    Returns
+    -------
+    results: np.ndarray
+        Structured array of evaluation results with the EVALUATION_DTYPE. The maximum rho is infinite if the action ends
+        the episode or can't be simulated. The exception field contains the names of the exceptions raised by the
+        action, if any.
+    """
+    # the observation already comes from grid2op, so this doesn't cost anything at this point
+    from grid2op.Exceptions import (  # pylint: disable=import-outside-toplevel
+        Grid2OpException,
+    )
+
+    results = np.zeros(len(actions), dtype=EVALUATION_DTYPE)
+    results["max_rho"] = np.inf
+
+    for i, action in enumerate(actions):
+        if isinstance(action, np.ndarray):
+            action = {"set_bus": action}
+
+        try:
+            simulated_observation, reward, done, info = observation.simulate(action_space(action), time_step=1)
+        except Grid2OpException as exception:
+            results[i]["done"] = True
+            results[i]["exception"] = type(exception).__name__
+            continue
+
+        results[i]["reward"] = reward
+        results[i]["done"] = done
+        results[i]["exception"] = ", ".join(type(exception).__name__ for exception in info["exception"])
+
+        if not done:
+            results[i]["max_rho"] = simulated_observation.rho.max()
+
+    return results
+
+
+def evaluate_in_parallel(
+    action_space: ActionSpace,
+    observation: Observation,
+    actions: list[dict] | np.ndarray,
+    num_workers: int | None = None,
+) -> np.ndarray:
+    """
+    Simulate each of the actions one step into the future from the given observation, in parallel.
+
+    The worker processes are forked, so they share the observation (and its simulation backend) with the parent process
+    as a read-only snapshot without pickling it, and each of them evaluates an equal chunk of the actions. If forking
+    isn't available on the platform, the actions are evaluated in the current process.
+
+    Parameters
+    ----------
+    action_space: ActionSpace
+        Action space.
+    observation: Observation
+        Observation to evaluate the actions from.
+    actions: list[dict] | np.ndarray
+        Action dictionaries, or set_bus vectors of shape (num_actions, dim_topo).
+    num_workers: int | None
+        Number of worker processes. If None, use all the CPUs.
+
+    Returns
+    -------
+    results: np.ndarray
+        Structured array of evaluation results with the EVALUATION_DTYPE.
+    """
+    num_workers = os.cpu_count() if num_workers is None else num_workers
+    num_workers = max(1, min(num_workers, len(actions)))
+
+    if num_workers == 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return evaluate(action_space, observation, actions)
+
+    chunk_bounds = np.linspace(0, len(actions), num_workers + 1).astype(int)
+    chunks = [actions[start:end] for start, end in zip(chunk_bounds[:-1], chunk_bounds[1:])]
+
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(action_space, observation),
+    ) as executor:
+        return np.concatenate(list(executor.map(_evaluate_chunk, chunks)))
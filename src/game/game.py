@@ -1,30 +1,264 @@
+from __future__ import annotations
+
+import copy
+import functools
 import pprint
+import time
+from enum import StrEnum
+from typing import TYPE_CHECKING, Callable
 
 import numpy as np
-from grid2op import Observation
-from grid2op.Agent import DoNothingAgent
-from grid2op.Environment import Environment
-from grid2op.PlotGrid import PlotMatplot
 from tqdm import tqdm
 
+from src.game.action_builder import ActionBuilder
+from src.game.action_table import (
+    format_html_table,
+    format_selected_actions_html,
+    format_text_table,
+)
+from src.game.evaluation import evaluate_in_parallel
+from src.game.recorder import EpisodeRecorder
+from src.game.session import SessionAction, SessionLog
+from src.game.utils import (
+    TopologyIndex,
+    fast_forward_chronics,
+    seek_chronics,
+    seek_random_start,
+)
+
+if TYPE_CHECKING:
+    from grid2op import Observation
+    from grid2op.Environment import Environment
+
+    from src.plotting.grid_renderer import GridRenderer
+
+
+class PreviewMode(StrEnum):
+    SIMULATE = "simulate"
+    DEEPCOPY = "deepcopy"
+
 
 class Game:
     """A class that keeps the state of the game, e.g., the state of the power grid simulation."""
 
-    action_dict: dict
+    action_builder: ActionBuilder
     rho_threshold: float = 0.99
+    preview_mode: PreviewMode = PreviewMode.SIMULATE
 
     cumulative_reward: float = 0.0
     reward: float = 0.0
     info: dict = {}
-
-    def __init__(self, environment: Environment):
+    steps_per_second: float = 0.0
+
+    chronics_id: str
+    start_step: int
+    session_log: SessionLog
+
+    def __init__(
+        self,
+        environment: Environment,
+        chronics_id: int | str | None = None,
+        start_step: int = 0,
+        random_start: bool = False,
+        seed: int | None = None,
+        recorder: EpisodeRecorder | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        environment: Environment
+            Environment.
+        chronics_id: int | str | None
+            Chronics ID to start the game from, either its index or the name of its folder. If None, the next chronics
+            of the environment are used.
+        start_step: int
+            Time step to start the game from.
+        random_start: bool
+            If True, start from a random time step of randomly chosen chronics, ignoring chronics_id and start_step.
+        seed: int | None
+            Random seed of the environment and of the start point sampler.
+        recorder: EpisodeRecorder | None
+            If given, every step of the simulation is recorded by it.
+        """
         self.environment = environment
+        self.topology = TopologyIndex(environment)
+        self.do_nothing_action = environment.action_space({})
+        self.action_builder = ActionBuilder(environment)
+
+        self.recorder = recorder
+
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        if random_start:
+            self.seek_random()
+        else:
+            self.seek(chronics_id, start_step)
+
+    def seek(self, chronics_id: int | str | None = None, start_step: int = 0) -> Observation:
+        """
+        Restart the game from the given time step of the given chronics, without simulating the preceding time steps.
+
+        Parameters
+        ----------
+        chronics_id: int | str | None
+            Chronics ID, either its index or the name of its folder. If None, the next chronics are used.
+        start_step: int
+            Time step to start from.
+
+        Returns
+        -------
+        observation: Observation
+            Observation at the start time step.
+        """
+        observation = seek_chronics(self.environment, chronics_id, start_step, seed=self.seed)
+        self.start_game(observation, self.environment.chronics_handler.get_name(), int(observation.current_step))
+
+        return observation
+
+    def seek_random(self) -> Observation:
+        """
+        Restart the game from a random time step of randomly chosen chronics. The start point is sampled with the random
+        number generator of the game, so the sequence of start points is reproducible given the seed.
+
+        Returns
+        -------
+        observation: Observation
+            Observation at the start time step.
+        """
+        observation, chronics_id, start_step = seek_random_start(self.environment, self.rng, seed=self.seed)
+        self.start_game(observation, chronics_id, start_step)
+
+        return observation
+
+    def start_game(self, observation: Observation, chronics_id: str, start_step: int):
+        """
+        Reset the state of the game to the start of an episode.
+
+        Parameters
+        ----------
+        observation: Observation
+            Initial observation.
+        chronics_id: str
+            Name of the chronics folder.
+        start_step: int
+            Start time step.
+
+        Returns
+        -------
+        """
+        self.observation = observation
+        self.chronics_id = chronics_id
+        self.start_step = start_step
+
+        self.cumulative_reward = 0.0
+        self.reward = 0.0
+        self.info = {}
         self.clear_action_dict()
 
-        self.plotter = PlotMatplot(environment.observation_space)
+        self.session_log = SessionLog(self.environment.name, chronics_id, start_step, self.seed)
+        self.update_session_log()
+
+    def update_session_log(self):
+        """
+        Update the current position of the game in the session log.
+
+        Returns
+        -------
+        """
+        self.session_log.time_step = int(self.observation.current_step)
+        self.session_log.cumulative_reward = float(self.cumulative_reward)
+        self.session_log.topo_vect = self.observation.topo_vect.tolist()
+
+    @classmethod
+    def from_session(cls, environment: Environment, session_log: SessionLog, **kwargs) -> "Game":
+        """
+        Restore a saved game session. The chronics are fast-forwarded from the start of the session to each of the
+        logged actions, which are then re-applied, and finally to the time step at which the session was saved. The
+        do-nothing steps in between aren't simulated.
+
+        Parameters
+        ----------
+        environment: Environment
+            Environment the session was played on.
+        session_log: SessionLog
+            Session log.
+        kwargs
+            Keyword arguments passed to the constructor, e.g., the recorder.
+
+        Returns
+        -------
+        game: Game
+            Game in the same state as when the session was saved.
+
+        Raises
+        ------
+        ValueError
+            If the session was played on a different environment.
+        RuntimeError
+            If the replay doesn't reach a logged time step, or if the restored topology doesn't match the logged one,
+            e.g., because the protections disconnected an overloaded line in one of the steps that weren't simulated.
+        """
+        if environment.name != session_log.environment_name:
+            raise ValueError(f"The session was played on '{session_log.environment_name}', not on '{environment.name}'")
+
+        game = cls(environment, session_log.chronics_id, session_log.start_step, seed=session_log.seed, **kwargs)
+
+        for session_action in session_log.actions:
+            game.fast_forward(session_action.time_step)
+            game.check_time_step(session_action.time_step)
+            action = environment.action_space({"set_bus": session_action.to_set_bus_vector(environment.dim_topo)})
+            game.observation, game.reward, _, game.info = environment.step(action)
+            game.session_log.actions.append(session_action)
+
+        game.fast_forward(session_log.time_step)
+        game.check_time_step(session_log.time_step)
+        game.cumulative_reward = session_log.cumulative_reward
+        game.update_session_log()
+
+        if game.session_log.topo_vect != session_log.topo_vect:
+            raise RuntimeError("The replayed session diverged from the logged one, the topologies don't match")
+
+        return game
 
-        self.observation = environment.reset()
+    def fast_forward(self, time_step: int):
+        """
+        Skip to the given time step of the chronics without simulating the steps in between.
+
+        Parameters
+        ----------
+        time_step: int
+            Time step.
+
+        Returns
+        -------
+        """
+        num_steps = time_step - self.observation.current_step
+        if num_steps > 0:
+            self.observation = fast_forward_chronics(self.environment, num_steps)
+
+    def check_time_step(self, time_step: int):
+        """
+        Check that the game is at the given time step, e.g., while replaying a session.
+
+        Parameters
+        ----------
+        time_step: int
+            Expected time step.
+
+        Returns
+        -------
+
+        Raises
+        ------
+        RuntimeError
+            If the game is at another time step.
+        """
+        if self.observation.current_step != time_step:
+            raise RuntimeError(
+                f"The replayed session diverged from the logged one, it's at time step {self.observation.current_step}"
+                f" instead of {time_step}"
+            )
 
     def clear_action_dict(self):
         """
@@ -33,56 +267,90 @@ class Game:
         Returns
         -------
         """
-        self.action_dict = {"set_bus": {"lines_or_id": [], "lines_ex_id": [], "generators_id": [], "loads_id": []}}
+        self.action_builder.clear()
 
-    def print_action_dict(self):
+    @property
+    def action_dict(self) -> dict:
         """
-        Print the action dictionary.
+        Get the action dictionary of the currently selected actions.
 
         Returns
         -------
+        action_dict: dict
+            Action dictionary.
         """
-        # TODO could also print the status of the elements
+        return self.action_builder.to_dict()
 
-        line_indices_str = ""
-        line_or_to_subid_str = ""
-        line_ex_to_subid_str = ""
-
-        idx_formatting = "4d"
-
-        for i in np.arange(self.environment.n_line):
-            line_indices_str += f"{i:{idx_formatting}}"
-            line_or_to_subid_str += f"{self.environment.line_or_to_subid[i]:{idx_formatting}}"
-            line_ex_to_subid_str += f"{self.environment.line_ex_to_subid[i]:{idx_formatting}}"
-
-        gen_indices_str = ""
-        gen_to_subid_str = ""
-        for i in np.arange(self.environment.n_gen):
-            gen_indices_str += f"{i:{idx_formatting}}"
-            gen_to_subid_str += f"{self.environment.gen_to_subid[i]:{idx_formatting}}"
-
-        load_indices_str = ""
-        load_to_subid_str = ""
-        for i in np.arange(self.environment.n_load):
-            load_indices_str += f"{i:{idx_formatting}}"
-            load_to_subid_str += f"{self.environment.load_to_subid[i]:{idx_formatting}}"
-
-        name_formatting = "20"
-
-        dashes = "".join(["-"] * 100)
-        print(
-            f"{'Line ID:':{name_formatting}}{line_indices_str}\n\n"
-            f"{'line_or_to_subid:':{name_formatting}}{line_or_to_subid_str}\n"
-            f"{'line_ex_to_subid:':{name_formatting}}{line_ex_to_subid_str}\n\n"
-            f"{dashes}\n"
-            f"{'Generator ID:':{name_formatting}}{gen_indices_str}\n\n"
-            f"{'gen_to_subid:':{name_formatting}}{gen_to_subid_str}\n\n"
-            f"{dashes}\n"
-            f"{'Load ID:':{name_formatting}}{load_indices_str}\n\n"
-            f"{'load_to_subid:':{name_formatting}}{load_to_subid_str}\n\n"
-            f"{dashes}\n"
+    @functools.cached_property
+    def renderer(self) -> GridRenderer:
+        """
+        Get the renderer of the grid. It's only created when the grid is plotted for the first time, so headless runs,
+        e.g., in worker processes, don't import matplotlib.
+
+        Returns
+        -------
+        renderer: GridRenderer
+            Grid renderer.
+        """
+        from src.plotting.grid_renderer import (  # pylint: disable=import-outside-toplevel
+            GridRenderer,
         )
 
+        return GridRenderer(self.environment)
+
+    @functools.cached_property
+    def topology_table(self) -> str:
+        """
+        Get the text table of which substation every line, generator and load is connected to. It never changes for an
+        environment, so it's only formatted once.
+
+        Returns
+        -------
+        table: str
+            Text table.
+        """
+        return format_text_table(self.environment)
+
+    @functools.cached_property
+    def topology_table_html(self) -> str:
+        """
+        Get the HTML table of which substation every line, generator and load is connected to. It never changes for an
+        environment, so it's only formatted once.
+
+        Returns
+        -------
+        table: str
+            HTML table.
+        """
+        return format_html_table(self.environment)
+
+    def print_action_dict(self, html: bool = False):
+        """
+        Print the topology table followed by the action dictionary. Only the action dictionary is formatted on every
+        call, the topology table is cached.
+
+        Parameters
+        ----------
+        html: bool
+            If True, display HTML tables instead of printing text, e.g., in an output widget.
+
+        Returns
+        -------
+        """
+        # TODO could also print the status of the elements
+
+        if html:
+            # only needed in notebooks, so headless runs don't import IPython
+            from IPython.display import (  # pylint: disable=import-outside-toplevel
+                HTML,
+                display,
+            )
+
+            display(HTML(self.topology_table_html + format_selected_actions_html(self.action_dict)))
+            return
+
+        print(self.topology_table)
+
         print("\nSelected actions: ", end="")
         pp = pprint.PrettyPrinter(depth=10)
         pp.pprint(self.action_dict)
@@ -110,27 +378,127 @@ class Game:
         """
         return list(range(1, self.environment.n_busbar_per_sub + 1))
 
-    def print_info(self):
+    def print_info(self, reward: float | None = None, info: dict | None = None):
         """
-        Print the information and reward received after stepping through the environment.
+        Print the information and reward received after stepping through the environment. If the reward and info aren't
+        given, print the ones from the last step of the game.
+
+        Parameters
+        ----------
+        reward: float | None
+            Reward to print.
+        info: dict | None
+            Information dictionary to print.
 
         Returns
         -------
         """
-        print(f"Action reward: {self.reward}")
+        reward = self.reward if reward is None else reward
+        info = self.info if info is None else info
+
+        print(f"Action reward: {reward}")
         print("\nInfo: ", end="")
         pp = pprint.PrettyPrinter(depth=10)
-        pp.pprint(self.info)
+        pp.pprint(info)
+
+    def preview_action(
+        self, action_dict: dict, mode: PreviewMode | None = None
+    ) -> tuple[Observation, float, bool, dict]:
+        """
+        Evaluate what would happen one step into the future if the action was applied, without changing the state of
+        the game.
+
+        By default, the action is evaluated with `observation.simulate`, which reuses the simulation backend of the
+        observation and the forecasts of the next time step, so the memory footprint doesn't grow with the number of
+        previews. The deepcopy mode steps through a full copy of the environment instead. It's exact, but slow and
+        memory hungry on larger grids, so it's only kept as a fallback, e.g., for environments without forecasts.
+
+        Parameters
+        ----------
+        action_dict: dict
+            Action dictionary.
+        mode: PreviewMode | None
+            Preview mode. If None, the `preview_mode` of the game is used.
+
+        Returns
+        -------
+        observation: Observation
+            Observation after applying the action.
+        reward: float
+            Reward.
+        done: bool
+            Done signal.
+        info: dict
+            Information dictionary.
+
+        Raises
+        ------
+        ValueError
+            If the preview mode is not supported.
+        """
+        mode = self.preview_mode if mode is None else mode
+        action = self.environment.action_space(action_dict)
 
-    def continue_simulation(self, initial_action_dict: dict) -> tuple[Observation, float, bool, dict]:
+        if mode == PreviewMode.SIMULATE:
+            return self.observation.simulate(action, time_step=1)
+
+        if mode == PreviewMode.DEEPCOPY:
+            return copy.deepcopy(self.environment).step(action)
+
+        raise ValueError(f"Preview mode '{mode}' is not supported")
+
+    def evaluate_actions(self, actions: list[dict] | np.ndarray, num_workers: int | None = None) -> np.ndarray:
+        """
+        Evaluate many candidate actions one step into the future from the current state of the game, without changing
+        it. The actions are split between worker processes which share the current observation as a read-only snapshot.
+
+        Parameters
+        ----------
+        actions: list[dict] | np.ndarray
+            Action dictionaries, or set_bus vectors of shape (num_actions, dim_topo).
+        num_workers: int | None
+            Number of worker processes. If None, use all the CPUs.
+
+        Returns
+        -------
+        results: np.ndarray
+            Structured array with the maximum rho, reward, done signal and raised exceptions of each action.
+        """
+        return evaluate_in_parallel(self.environment.action_space, self.observation, actions, num_workers)
+
+    def continue_simulation(
+        self,
+        initial_action_dict: dict,
+        progress_interval: int | None = 1,
+        should_stop: Callable[[], bool] | None = None,
+        callback: Callable[[int], None] | None = None,
+        callback_interval: int = 1,
+    ) -> tuple[Observation, float, bool, dict]:
         """
         Continue the simulation. Apply an initial action, then keep doing nothing until any of the lines become
         overloaded. At that point stop and return some information.
 
+        The simulation can also be stopped from the outside, e.g., from another thread, with `should_stop`, which is
+        checked after every step. In that case it stops early, without an error.
+
+        Formatting the progress description dominates the loop for long chronics, so it's only updated every
+        `progress_interval` steps. Setting it to None disables the progress bar altogether, i.e., the simulation is
+        fast-forwarded at the speed of the backend. The achieved speed is shown in the final progress description and
+        stored in `steps_per_second`.
+
         Parameters
         ----------
         initial_action_dict: dict
             Initial action dictionary.
+        progress_interval: int | None
+            Number of steps between updates of the progress bar description, at least 1. If None, the progress bar is
+            disabled.
+        should_stop: Callable[[], bool] | None
+            If given, the simulation stops as soon as it returns True.
+        callback: Callable[[int], None] | None
+            If given, it's called with the number of steps simulated so far every `callback_interval` steps.
+        callback_interval: int
+            Number of steps between the callback calls, at least 1.
 
         Returns
         -------
@@ -142,25 +510,33 @@ class Game:
             Done signal.
         info: dict
             Information dictionary.
-        """
-        do_nothing_agent = DoNothingAgent(self.environment.action_space)
-
-        def while_loop():
-            while True:
-                yield
-
-        # TODO is it possible to start from random points in time?
 
-        initial_action_flag = True
-        progress_bar = tqdm(while_loop())
-        for _ in progress_bar:
-            if initial_action_flag:
-                action = self.environment.action_space(initial_action_dict)
-                initial_action_flag = False
-            else:
-                action = do_nothing_agent.act(None, 0, False)
+        Raises
+        ------
+        ValueError
+            If the progress interval or the callback interval isn't positive.
+        RuntimeError
+            If the done signal is received before any of the lines become overloaded.
+        """
+        if progress_interval is not None and progress_interval <= 0:
+            raise ValueError(f"The progress interval has to be positive or None, got {progress_interval}")
+        if callback_interval <= 0:
+            raise ValueError(f"The callback interval has to be positive, got {callback_interval}")
+
+        action = self.environment.action_space(initial_action_dict)
+        if action.set_bus.any():
+            self.session_log.actions.append(
+                SessionAction.from_set_bus_vector(int(self.observation.current_step), action.set_bus)
+            )
 
+        progress_bar = tqdm(disable=progress_interval is None)
+        num_steps = 0
+        self.steps_per_second = 0.0
+        start_time = time.perf_counter()
+        while True:
             observation, reward, done, info = self.environment.step(action)
+            action = self.do_nothing_action
+            num_steps += 1
 
             self.observation = observation
             self.info = info
@@ -168,21 +544,56 @@ class Game:
 
             self.cumulative_reward += reward
 
-            progress_bar.set_description(
-                f"Running simulation "
-                f"{str(observation.day).zfill(2)}/{str(observation.month).zfill(2)}/{str(observation.year)} "
-                f"{str(observation.hour_of_day).zfill(2)}:{str(observation.minute_of_hour).zfill(2)} "
-                f"Cumulative reward = {self.cumulative_reward} "
-                f"Reward = {reward}"
-            )
+            if self.recorder is not None:
+                self.recorder.append(observation, reward, done)
+
+            if progress_interval is not None:
+                if num_steps % progress_interval == 0:
+                    self.steps_per_second = num_steps / (time.perf_counter() - start_time)
+                    progress_bar.set_description(self.get_progress_description(), refresh=False)
+                progress_bar.update()
+
+            if callback is not None and num_steps % callback_interval == 0:
+                self.steps_per_second = num_steps / (time.perf_counter() - start_time)
+                callback(num_steps)
 
-            if done:
-                # TODO got this even though the threshold didn't trigger
-                #  what triggers the done signal exactly?
+            if done or (observation.rho >= self.rho_threshold).any():
+                break
 
-                self.print_info()
+            if should_stop is not None and should_stop():
+                break
 
-                raise RuntimeError(f"Done signal was True. Cumulative reward = {self.cumulative_reward}")
+        self.steps_per_second = num_steps / (time.perf_counter() - start_time)
+        progress_bar.set_description(self.get_progress_description(), refresh=False)
+        progress_bar.close()
+        self.update_session_log()
 
-            if (observation.rho >= self.rho_threshold).any():
-                return observation, reward, done, info
+        if done:
+            # TODO got this even though the threshold didn't trigger
+            #  what triggers the done signal exactly?
+
+            self.print_info()
+
+            raise RuntimeError(f"Done signal was True. Cumulative reward = {self.cumulative_reward}")
+
+        return observation, reward, done, info
+
+    def get_progress_description(self) -> str:
+        """
+        Get the description of the simulation progress, i.e., the date and time of the current observation, the rewards
+        and the simulation speed.
+
+        Returns
+        -------
+        description: str
+            Progress description.
+        """
+        observation = self.observation
+        return (
+            f"Running simulation "
+            f"{observation.day:02d}/{observation.month:02d}/{observation.year} "
+            f"{observation.hour_of_day:02d}:{observation.minute_of_hour:02d} "
+            f"Cumulative reward = {self.cumulative_reward} "
+            f"Reward = {self.reward} "
+            f"({self.steps_per_second:.0f} steps/s)"
+        )
@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+from typing import Callable, Hashable
+
+
+class UpdateBatcher:
+    """
+    Batches the widget updates caused by a single user interaction.
+
+    Every user interaction opens a batch. Changes to widgets made by the code within a batch, e.g., setting new options
+    of a widget, don't trigger the observers again; the code that made them is responsible for the follow-up updates.
+    Output refreshes requested within a batch are coalesced, so only the last one per key runs, once, when the outermost
+    batch closes.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.pending_refreshes: dict[Hashable, Callable[[], None]] = {}
+
+    @contextmanager
+    def batch(self):
+        """
+        Open a batch. Batches can be nested, the pending refreshes run when the outermost one closes.
+
+        Returns
+        -------
+        """
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+
+        if self.depth == 0:
+            self.flush()
+
+    def flush(self):
+        """
+        Run the pending refreshes.
+
+        Returns
+        -------
+        """
+        pending_refreshes = list(self.pending_refreshes.values())
+        self.pending_refreshes.clear()
+
+        for refresh in pending_refreshes:
+            refresh()
+
+    def request_refresh(self, key: Hashable, refresh: Callable[[], None]):
+        """
+        Request a refresh, e.g., of an output widget. Within a batch it's postponed until the batch closes, and it
+        replaces any other refresh requested with the same key. Outside of a batch it runs immediately.
+
+        Parameters
+        ----------
+        key: Hashable
+            Key of the refresh, e.g., the output widget that it refreshes.
+        refresh: Callable[[], None]
+            Refresh function.
+
+        Returns
+        -------
+        """
+        if self.depth == 0:
+            refresh()
+            return
+
+        self.pending_refreshes[key] = refresh
+
+    def observer(self, callback: Callable) -> Callable:
+        """
+        Wrap a widget observer so that it only reacts to user interactions. The wrapped callback runs within a batch,
+        and changes made within an open batch are ignored.
+
+        Parameters
+        ----------
+        callback: Callable
+            Observer callback.
+
+        Returns
+        -------
+        wrapped_callback: Callable
+            Observer callback that runs within a batch.
+        """
+
+        def wrapped_callback(*args, **kwargs):
+            if self.depth > 0:
+                return
+
+            with self.batch():
+                callback(*args, **kwargs)
+
+        return wrapped_callback
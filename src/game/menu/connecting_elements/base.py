@@ -1,28 +1,37 @@
 import ipywidgets
 
 from src.game.game import Game
+from src.game.menu.batching import UpdateBatcher
 
 
 class ConnectingElementBase(ipywidgets.VBox):
     description: str = "Description"
     substation_id: int = None
 
-    def __init__(self, init_substation_id: int, game: Game, widget_width: str, action_output: ipywidgets.Output):
+    def __init__(
+        self,
+        init_substation_id: int,
+        game: Game,
+        widget_width: str,
+        action_output: ipywidgets.Output,
+        batcher: UpdateBatcher,
+    ):
         self.set_substation_ID(init_substation_id)
         self.game = game
         self.action_output = action_output
+        self.batcher = batcher
 
         self.connecting_element_widget = ipywidgets.ToggleButtons(
             description=self.description, layout=ipywidgets.Layout(width=widget_width)
         )
         # self.update_busbar_widget()
-        self.connecting_element_widget.observe(self.update_busbar_widget, names=["value"])
+        self.connecting_element_widget.observe(self.batcher.observer(self.update_busbar_widget), names=["value"])
 
         self.busbar_widget = ipywidgets.ToggleButtons(
             description="Busbar", options=self.game.get_busbar_options(), layout=ipywidgets.Layout(width=widget_width)
         )
         # self.update_action_dictionary()
-        self.busbar_widget.observe(self.update_action_dictionary, names=["value"])
+        self.busbar_widget.observe(self.batcher.observer(self.update_action_dictionary), names=["value"])
 
         super().__init__(children=(self.connecting_element_widget, self.busbar_widget))
 
@@ -40,9 +49,25 @@ class ConnectingElementBase(ipywidgets.VBox):
         """
         self.substation_id = substation_id
 
+    def set_disabled(self, disabled: bool):
+        """
+        Enable or disable the element and busbar widgets.
+
+        Parameters
+        ----------
+        disabled: bool
+            True to disable the widgets.
+
+        Returns
+        -------
+        """
+        self.connecting_element_widget.disabled = disabled
+        self.busbar_widget.disabled = disabled
+
     def print_action_dictionary(self):
         """
-        Print the action dictionary and output it to the action output.
+        Print the action dictionary and output it to the action output. Within a batch of updates, the action output is
+        only refreshed once, when the batch closes.
 
         Returns
         -------
@@ -50,10 +75,13 @@ class ConnectingElementBase(ipywidgets.VBox):
 
         @self.action_output.capture()
         def print_action_dict():
-            self.game.print_action_dict()
+            self.game.print_action_dict(html=True)
+
+        def refresh_action_output():
+            self.action_output.clear_output()
+            print_action_dict()
 
-        self.action_output.clear_output()
-        print_action_dict()
+        self.batcher.request_refresh(self.action_output, refresh_action_output)
 
     def update_connecting_element_widget(self, *args, **kwargs):
         raise NotImplementedError()
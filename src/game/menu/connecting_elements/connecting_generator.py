@@ -1,7 +1,6 @@
-import numpy as np
-
+from src.game.action_builder import ElementType
 from src.game.menu.connecting_elements.base import ConnectingElementBase
-from src.game.utils import DONT_CLICK_THIS, add_or_overwrite_action, get_busbar_status
+from src.game.utils import DONT_CLICK_THIS
 
 
 class ConnectingGenerators(ConnectingElementBase):
@@ -14,8 +13,7 @@ class ConnectingGenerators(ConnectingElementBase):
         Returns
         -------
         """
-        environment = self.game.environment
-        generators_at_substation = list(np.arange(environment.n_gen)[environment.gen_to_subid == self.substation_id])
+        generators_at_substation = list(self.game.topology.gens_at(self.substation_id))
 
         # for god-knows-what reason having the option list be [0] screws up the widget
         if generators_at_substation == [0]:
@@ -34,7 +32,6 @@ class ConnectingGenerators(ConnectingElementBase):
         Returns
         -------
         """
-        action_dict = self.game.action_dict
         generator_idx = self.connecting_element_widget.value
 
         if generator_idx == DONT_CLICK_THIS:
@@ -44,8 +41,8 @@ class ConnectingGenerators(ConnectingElementBase):
             )
 
         self.busbar_widget.options = self.game.get_busbar_options()
-        self.busbar_widget.value = get_busbar_status(
-            generator_idx, action_dict["set_bus"]["generators_id"], self.game.observation.gen_bus
+        self.busbar_widget.value = self.game.action_builder.get_busbar(
+            ElementType.GENERATOR, generator_idx, self.game.observation.gen_bus
         )
 
         self.update_action_dictionary()
@@ -60,10 +57,8 @@ class ConnectingGenerators(ConnectingElementBase):
         -------
         """
         generator_idx = self.connecting_element_widget.value
-        self.game.action_dict["set_bus"]["generators_id"] = add_or_overwrite_action(
-            (generator_idx, self.busbar_widget.value),
-            self.game.action_dict["set_bus"]["generators_id"],
-            self.game.observation.gen_bus,
+        self.game.action_builder.set_busbar(
+            ElementType.GENERATOR, generator_idx, self.busbar_widget.value, self.game.observation.gen_bus
         )
 
         self.print_action_dictionary()
@@ -1,5 +1,5 @@
+from src.game.action_builder import ElementType
 from src.game.menu.connecting_elements.base import ConnectingElementBase
-from src.game.utils import add_or_overwrite_action, get_busbar_status, get_line_id
 
 
 class ConnectingLines(ConnectingElementBase):
@@ -12,13 +12,7 @@ class ConnectingLines(ConnectingElementBase):
         Returns
         -------
         """
-        environment = self.game.environment
-
-        lines_ex_at_substation = list(environment.line_or_to_subid[environment.line_ex_to_subid == self.substation_id])
-
-        lines_or_at_substation = list(environment.line_ex_to_subid[environment.line_or_to_subid == self.substation_id])
-
-        self.connecting_element_widget.options = lines_ex_at_substation + lines_or_at_substation
+        self.connecting_element_widget.options = list(self.game.topology.line_destinations(self.substation_id))
         self.connecting_element_widget.value = self.connecting_element_widget.options[0]
 
         self.update_busbar_widget()
@@ -38,23 +32,22 @@ class ConnectingLines(ConnectingElementBase):
         """
         line_destination = self.connecting_element_widget.value
 
-        action_dict = self.game.action_dict
+        action_builder = self.game.action_builder
         observation = self.game.observation
-        environment = self.game.environment
 
-        line_or_idx, line_ex_idx = get_line_id(environment, self.substation_id, line_destination)
+        line_or_idx, line_ex_idx = self.game.topology.get_line_id(self.substation_id, line_destination)
 
         if line_or_idx.size == 1:
-            self.busbar_widget.value = get_busbar_status(
-                line_or_idx.item(), action_dict["set_bus"]["lines_or_id"], observation.line_or_bus
+            self.busbar_widget.value = action_builder.get_busbar(
+                ElementType.LINE_OR, line_or_idx.item(), observation.line_or_bus
             )
 
             self.update_action_dictionary()
             return
 
         if line_ex_idx.size == 1:
-            self.busbar_widget.value = get_busbar_status(
-                line_ex_idx.item(), action_dict["set_bus"]["lines_ex_id"], observation.line_ex_bus
+            self.busbar_widget.value = action_builder.get_busbar(
+                ElementType.LINE_EX, line_ex_idx.item(), observation.line_ex_bus
             )
 
             self.update_action_dictionary()
@@ -77,24 +70,20 @@ class ConnectingLines(ConnectingElementBase):
             If the selected line somehow doesn't exist.
         """
         line_destination = self.connecting_element_widget.value
-        line_or_idx, line_ex_idx = get_line_id(self.game.environment, self.substation_id, line_destination)
+        line_or_idx, line_ex_idx = self.game.topology.get_line_id(self.substation_id, line_destination)
 
         observation = self.game.observation
         if line_or_idx.size == 1:
-            self.game.action_dict["set_bus"]["lines_or_id"] = add_or_overwrite_action(
-                (line_or_idx.item(), self.busbar_widget.value),
-                self.game.action_dict["set_bus"]["lines_or_id"],
-                observation.line_or_bus,
+            self.game.action_builder.set_busbar(
+                ElementType.LINE_OR, line_or_idx.item(), self.busbar_widget.value, observation.line_or_bus
             )
 
             self.print_action_dictionary()
             return
 
         if line_ex_idx.size == 1:
-            self.game.action_dict["set_bus"]["lines_ex_id"] = add_or_overwrite_action(
-                (line_ex_idx.item(), self.busbar_widget.value),
-                self.game.action_dict["set_bus"]["lines_ex_id"],
-                observation.line_ex_bus,
+            self.game.action_builder.set_busbar(
+                ElementType.LINE_EX, line_ex_idx.item(), self.busbar_widget.value, observation.line_ex_bus
             )
 
             self.print_action_dictionary()
@@ -1,7 +1,6 @@
-import numpy as np
-
+from src.game.action_builder import ElementType
 from src.game.menu.connecting_elements.base import ConnectingElementBase
-from src.game.utils import DONT_CLICK_THIS, add_or_overwrite_action, get_busbar_status
+from src.game.utils import DONT_CLICK_THIS
 
 
 # TODO lots of copy pasting from the generator side. Might need to be repeated for the storage elements
@@ -15,8 +14,7 @@ class ConnectingLoads(ConnectingElementBase):
         Returns
         -------
         """
-        environment = self.game.environment
-        loads_at_substation = list(np.arange(environment.n_load)[environment.load_to_subid == self.substation_id])
+        loads_at_substation = list(self.game.topology.loads_at(self.substation_id))
 
         # for god-knows-what reason having the option list be [0] screws up the widget
         if loads_at_substation == [0]:
@@ -35,7 +33,6 @@ class ConnectingLoads(ConnectingElementBase):
         Returns
         -------
         """
-        action_dict = self.game.action_dict
         load_idx = self.connecting_element_widget.value
 
         if load_idx == DONT_CLICK_THIS:
@@ -44,8 +41,8 @@ class ConnectingLoads(ConnectingElementBase):
             )
 
         self.busbar_widget.options = self.game.get_busbar_options()
-        self.busbar_widget.value = get_busbar_status(
-            load_idx, action_dict["set_bus"]["loads_id"], self.game.observation.load_bus
+        self.busbar_widget.value = self.game.action_builder.get_busbar(
+            ElementType.LOAD, load_idx, self.game.observation.load_bus
         )
 
         self.update_action_dictionary()
@@ -60,10 +57,8 @@ class ConnectingLoads(ConnectingElementBase):
         -------
         """
         load_idx = self.connecting_element_widget.value
-        self.game.action_dict["set_bus"]["loads_id"] = add_or_overwrite_action(
-            (load_idx, self.busbar_widget.value),
-            self.game.action_dict["set_bus"]["loads_id"],
-            self.game.observation.load_bus,
+        self.game.action_builder.set_busbar(
+            ElementType.LOAD, load_idx, self.busbar_widget.value, self.game.observation.load_bus
         )
 
         self.print_action_dictionary()
@@ -1,16 +1,24 @@
-import copy
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+import traceback
 from enum import StrEnum
+from typing import TYPE_CHECKING
 
 import ipywidgets
-import numpy as np
-from grid2op import Observation
-from ipywidgets.widgets.interaction import show_inline_matplotlib_plots
-from matplotlib import pyplot as plt
+from IPython.display import display
 
 from src.game.game import Game
+from src.game.menu.batching import UpdateBatcher
 from src.game.menu.connecting_elements.connecting_generator import ConnectingGenerators
 from src.game.menu.connecting_elements.connecting_lines import ConnectingLines
 from src.game.menu.connecting_elements.connecting_load import ConnectingLoads
+from src.game.menu.substation_selector import SubstationSelector
+
+if TYPE_CHECKING:
+    from grid2op import Observation
 
 
 class ConnectingElementType(StrEnum):
@@ -21,33 +29,55 @@ class ConnectingElementType(StrEnum):
 
 class Menu(ipywidgets.VBox):
     widget_width: str = "1000px"
-    action_output: ipywidgets.Output = ipywidgets.Output()
-    plot_output: ipywidgets.Output = ipywidgets.Output()
 
-    def __init__(self, game: Game, continue_simulation: bool = True):
+    # seconds between the snapshots of a simulation running in the background
+    snapshot_interval: float = 2.0
+
+    def __init__(self, game: Game, continue_simulation: bool = True, run_in_background: bool = True):
+        """
+        Parameters
+        ----------
+        game: Game
+            Game.
+        continue_simulation: bool
+            If True, continue the simulation right away.
+        run_in_background: bool
+            If True and there's a running event loop, e.g., in a notebook, continue the simulation in a background
+            thread, so that the widgets stay responsive.
+        """
         super().__init__()
         self.game = game
         self.connecting_element_submenus = {}
 
+        self.action_output = ipywidgets.Output()
+        self.plot_output = ipywidgets.Output()
+        self.run_in_background = run_in_background
+        self.simulation_task = None
+        self.simulated_steps = 0
+        self.cancel_event = threading.Event()
+
+        # one user interaction, one recomputation and one refresh of each output
+        self.batcher = UpdateBatcher()
+
         # APPLY ACTION
         self.apply_action_button = ipywidgets.Button(description="Apply action")
-        self.apply_action_button.on_click(self.apply_action)
+        self.apply_action_button.on_click(self.batcher.observer(self.apply_action))
 
         # RESET
         self.reset_button = ipywidgets.Button(description="Reset")
-        self.reset_button.on_click(self.reset)
+        self.reset_button.on_click(self.batcher.observer(self.reset))
 
         # CONTINUE SIMULATION
         self.continue_simulation_button = ipywidgets.Button(description="Continue simulation")
-        self.continue_simulation_button.on_click(self.continue_simulation)
+        self.continue_simulation_button.on_click(self.batcher.observer(self.continue_simulation))
+
+        # CANCEL SIMULATION
+        self.cancel_simulation_button = ipywidgets.Button(description="Cancel simulation", disabled=True)
+        self.cancel_simulation_button.on_click(self.batcher.observer(self.cancel_simulation))
+        self.progress_label = ipywidgets.Label()
 
         # SUBSTATION ID
-        self.substation_id_widget = ipywidgets.ToggleButtons(
-            options=self.game.get_substation_ids(),
-            value=self.game.get_substation_ids()[0],
-            description="Substation ID",
-            layout=ipywidgets.Layout(width=self.widget_width),
-        )
+        self.substation_id_widget = SubstationSelector(self.game, self.widget_width)
 
         # CONNECTING ELEMENT TYPE
         self.connecting_element_type_widget = ipywidgets.ToggleButtons(
@@ -55,15 +85,18 @@ class Menu(ipywidgets.VBox):
             layout=ipywidgets.Layout(width=self.widget_width),
         )
 
-        self.substation_id_widget.observe(self.update_connecting_element_type, names=["value"])
+        self.substation_id_widget.observe(self.batcher.observer(self.update_connecting_element_type), names=["value"])
 
         # CONNECTING ELEMENT
-        self.connecting_element_type_widget.observe(self.update_connecting_element_submenu, names=["value"])
+        self.connecting_element_type_widget.observe(
+            self.batcher.observer(self.update_connecting_element_submenu), names=["value"]
+        )
 
-        self.update_connecting_element_type()
+        with self.batcher.batch():
+            self.update_connecting_element_type()
 
-        if continue_simulation:
-            self.continue_simulation()
+            if continue_simulation:
+                self.continue_simulation()
 
     def set_children(self):
         """
@@ -76,15 +109,17 @@ class Menu(ipywidgets.VBox):
             self.apply_action_button,
             self.reset_button,
             self.continue_simulation_button,
+            self.cancel_simulation_button,
+            self.progress_label,
             self.substation_id_widget,
             self.connecting_element_type_widget,
             self.connecting_element_submenus[self.connecting_element_type_widget.value],
         )
 
-    @plot_output.capture(clear_output=True)
     def apply_action(self, *args, **kwargs):
         """
-        Apply an action to a copy of the environment, step once into the future, and visualize the results.
+        Preview the action one step into the future, without changing the state of the game, and visualize how the
+        results differ from the current state.
 
         Parameters
         ----------
@@ -94,15 +129,35 @@ class Menu(ipywidgets.VBox):
         Returns
         -------
         """
-        action = self.game.environment.action_space(self.game.action_dict)
-        observation, reward, done, info = copy.deepcopy(self.game.environment).step(action)
-        self.plot_grid_state(observation, "Grid after applying the action")
 
-        self.game.print_info()
+        @self.plot_output.capture(clear_output=True)
+        def preview_action():
+            observation, reward, done, info = self.game.preview_action(self.game.action_dict)
+            self.plot_grid_diff(observation, "Grid after applying the action, changes highlighted")
+
+            self.game.print_info(reward, info)
+
+        preview_action()
+
+    def print_action_dictionary(self):
+        """
+        Print the action dictionary and output it to the action output. Within a batch of updates, the action output is
+        only refreshed once, when the batch closes.
+
+        Returns
+        -------
+        """
+
+        @self.action_output.capture(clear_output=True)
+        def print_action_dict():
+            self.game.print_action_dict(html=True)
+
+        self.batcher.request_refresh(self.action_output, print_action_dict)
 
     def reset(self, *args, **kwargs):
         """
-        Reset the menu state to the current state of the grid.
+        Reset the menu state to the current state of the grid. The existing widgets are reused: the action is cleared,
+        the first substation is selected, and the submenus are updated, which also refreshes the action output.
 
         Parameters
         ----------
@@ -116,22 +171,21 @@ class Menu(ipywidgets.VBox):
         @self.plot_output.capture(clear_output=True)
         def reset_menu():
             self.game.clear_action_dict()
-            self.__init__(self.game, continue_simulation=False)
+
+            with self.batcher.batch():
+                self.substation_id_widget.reset()
+                self.update_connecting_element_type()
+
             self.plot_grid_state(self.game.observation, "Grid with a problematic state")
 
             self.game.print_info()
 
         reset_menu()
 
-        @self.action_output.capture(clear_output=True)
-        def print_action_dict():
-            self.game.print_action_dict()
-
-        print_action_dict()
-
     def plot_grid_state(self, observation: Observation, title: str):
         """
-        Plot the grid state for the given observation.
+        Plot the grid state for the given observation. The figure of the game's renderer is reused, so only the parts
+        that depend on the observation are updated; displaying the figure draws it.
 
         Parameters
         ----------
@@ -143,13 +197,31 @@ class Menu(ipywidgets.VBox):
         Returns
         -------
         """
-        self.game.plotter.plot_obs(observation)
-        plt.gcf().suptitle(title)
-        show_inline_matplotlib_plots()
+        self.game.renderer.update(observation, title, redraw=False)
+        display(self.game.renderer.figure)
+
+    def plot_grid_diff(self, observation: Observation, title: str):
+        """
+        Plot the current grid state with the differences to the given observation highlighted on top of it.
+
+        Parameters
+        ----------
+        observation: Observation
+            Observation, e.g., the preview of an action.
+        title: str
+            Title.
+
+        Returns
+        -------
+        """
+        self.game.renderer.update_diff(self.game.observation, observation, title, redraw=False)
+        display(self.game.renderer.figure)
 
     def continue_simulation(self, *args, **kwargs):
         """
-        Take the current action dictionary state, apply it to the environment, and continue the simulation.
+        Take the current action dictionary state, apply it to the environment, and continue the simulation. If running
+        in the background is enabled and possible, the simulation is started in a background thread and this returns
+        right away.
 
         Parameters
         ----------
@@ -159,23 +231,140 @@ class Menu(ipywidgets.VBox):
         Returns
         -------
         """
+        if self.run_in_background:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+
+            if loop is not None:
+                self.set_simulation_running(True)
+                self.simulation_task = loop.create_task(self.continue_simulation_in_background())
+                return
 
         @self.plot_output.capture(clear_output=True)
         def continue_sim():
-            observation, reward, done, info = self.game.continue_simulation(self.game.action_dict)
-            self.game.clear_action_dict()
-            self.plot_grid_state(observation, "Grid with a problematic state")
-            self.game.print_info()
-
-            show_inline_matplotlib_plots()
+            self.game.continue_simulation(self.game.action_dict)
+            self.show_simulation_results()
 
         continue_sim()
 
-        @self.action_output.capture(clear_output=True)
-        def print_action_dictionary():
-            self.game.print_action_dict()
+        self.print_action_dictionary()
+
+    async def continue_simulation_in_background(self):
+        """
+        Continue the simulation in a background thread. While it runs, the progress is streamed to the progress label,
+        a snapshot of the grid is plotted every `snapshot_interval` seconds, and the buttons that would change the
+        state of the game or the action are disabled. The simulation can be stopped early with the cancel button.
+
+        Once the simulation is over, the widgets are always enabled again and the action output is refreshed. If the
+        simulation raised an exception, e.g., because the episode ended before any of the lines became overloaded, the
+        exception is shown in the action output.
+
+        Returns
+        -------
+        """
+        self.cancel_event.clear()
+        self.simulated_steps = 0
+
+        def count_steps(num_steps: int):
+            self.simulated_steps = num_steps
+
+        simulation = asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                self.game.continue_simulation,
+                self.game.action_dict,
+                progress_interval=None,
+                should_stop=self.cancel_event.is_set,
+                callback=count_steps,
+            ),
+        )
+
+        try:
+            while not simulation.done():
+                await asyncio.wait([simulation], timeout=self.snapshot_interval)
+                self.progress_label.value = f"{self.simulated_steps} steps. {self.game.get_progress_description()}"
+
+                if not simulation.done():
+                    with self.plot_output:
+                        self.plot_output.clear_output(wait=True)
+                        self.plot_grid_state(self.game.observation, "Simulation in progress")
+
+            # e.g., the done signal, which is raised after the action has been applied, so the results are still shown
+            error = simulation.exception()
+            if error is not None:
+                title = "Simulation stopped with an error"
+            elif self.cancel_event.is_set():
+                title = "Simulation cancelled"
+            else:
+                title = "Grid with a problematic state"
+
+            self.plot_output.clear_output()
+            with self.plot_output:
+                self.show_simulation_results(title)
+        finally:
+            self.set_simulation_running(False)
+            self.print_action_dictionary()
+
+        if error is not None:
+            with self.action_output:
+                traceback.print_exception(error)
+
+    def cancel_simulation(self, *args, **kwargs):
+        """
+        Stop the simulation running in the background after its current step.
+
+        Parameters
+        ----------
+        args
+        kwargs
+
+        Returns
+        -------
+        """
+        self.cancel_event.set()
+
+    def set_simulation_running(self, running: bool):
+        """
+        Enable or disable the buttons depending on whether a simulation is running in the background. The substation
+        and element widgets are disabled too, since the action is cleared once the simulation is over, and any changes
+        made in the meantime would be lost.
+
+        Parameters
+        ----------
+        running: bool
+            True if a simulation is running.
+
+        Returns
+        -------
+        """
+        self.apply_action_button.disabled = running
+        self.reset_button.disabled = running
+        self.continue_simulation_button.disabled = running
+        self.cancel_simulation_button.disabled = not running
 
-        print_action_dictionary()
+        self.substation_id_widget.set_disabled(running)
+        self.connecting_element_type_widget.disabled = running
+        for connecting_element_submenu in self.connecting_element_submenus.values():
+            connecting_element_submenu.set_disabled(running)
+
+    def show_simulation_results(self, title: str = "Grid with a problematic state"):
+        """
+        Clear the action dictionary, which has been applied, then plot the grid state and print the information about
+        the last step of the simulation.
+
+        Parameters
+        ----------
+        title: str
+            Title of the plot.
+
+        Returns
+        -------
+        """
+        self.game.clear_action_dict()
+        self.plot_grid_state(self.game.observation, title)
+        self.game.print_info()
 
     def update_connecting_element_type(self, *args, **kwargs):
         """
@@ -192,26 +381,27 @@ class Menu(ipywidgets.VBox):
         """
         options = []
         substation_id = self.substation_id_widget.value
+        topology = self.game.topology
 
-        if substation_id in np.stack((self.game.environment.line_ex_to_subid, self.game.environment.line_or_to_subid)):
+        if topology.lines_or_at(substation_id).size > 0 or topology.lines_ex_at(substation_id).size > 0:
             options.append(ConnectingElementType.LINE)
             if ConnectingElementType.LINE not in self.connecting_element_submenus:
                 self.connecting_element_submenus[ConnectingElementType.LINE] = ConnectingLines(
-                    substation_id, self.game, self.widget_width, self.action_output
+                    substation_id, self.game, self.widget_width, self.action_output, self.batcher
                 )
 
-        if substation_id in self.game.environment.gen_to_subid:
+        if topology.gens_at(substation_id).size > 0:
             options.append(ConnectingElementType.GENERATOR)
             if ConnectingElementType.GENERATOR not in self.connecting_element_submenus:
                 self.connecting_element_submenus[ConnectingElementType.GENERATOR] = ConnectingGenerators(
-                    substation_id, self.game, self.widget_width, self.action_output
+                    substation_id, self.game, self.widget_width, self.action_output, self.batcher
                 )
 
-        if substation_id in self.game.environment.load_to_subid:
+        if topology.loads_at(substation_id).size > 0:
             options.append(ConnectingElementType.LOAD)
             if ConnectingElementType.LOAD not in self.connecting_element_submenus:
                 self.connecting_element_submenus[ConnectingElementType.LOAD] = ConnectingLoads(
-                    substation_id, self.game, self.widget_width, self.action_output
+                    substation_id, self.game, self.widget_width, self.action_output, self.batcher
                 )
 
         self.connecting_element_type_widget.options = options
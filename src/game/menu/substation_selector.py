@@ -0,0 +1,238 @@
+import ipywidgets
+import numpy as np
+import traitlets
+
+from src.game.game import Game
+
+
+class SubstationSelector(ipywidgets.VBox):
+    """
+    Substation selector that scales to large grids. Only one page of substations is shown as buttons at a time, so the
+    number of widgets doesn't grow with the size of the grid. The substations can be searched by ID or name, or
+    filtered down to the ones attached to overloaded lines, sorted from the most to the least loaded.
+
+    The selected substation ID is the value trait, so the selector can be observed like any other widget.
+    """
+
+    value = traitlets.Int()
+
+    def __init__(self, game: Game, widget_width: str, page_size: int = 20):
+        """
+        Parameters
+        ----------
+        game: Game
+            Game.
+        widget_width: str
+            Widget width.
+        page_size: int
+            Number of substations per page.
+        """
+        self.game = game
+        self.page_size = page_size
+
+        self.substation_ids = np.array(self.game.get_substation_ids())
+        self.substation_names = np.array([name.lower() for name in self.game.environment.name_sub])
+        self.filtered_ids = self.substation_ids
+        self.labels = {}
+        self.page = 0
+
+        self.search_widget = ipywidgets.Text(
+            placeholder="Search by substation ID or name", description="Substation", continuous_update=False
+        )
+        self.search_widget.observe(self.search, names=["value"])
+
+        self.overloaded_button = ipywidgets.Button(description="Overloaded substations")
+        self.overloaded_button.on_click(self.show_overloaded)
+
+        self.previous_page_button = ipywidgets.Button(description="<", layout=ipywidgets.Layout(width="40px"))
+        self.previous_page_button.on_click(lambda _: self.show_page(self.page - 1))
+        self.next_page_button = ipywidgets.Button(description=">", layout=ipywidgets.Layout(width="40px"))
+        self.next_page_button.on_click(lambda _: self.show_page(self.page + 1))
+        self.page_label = ipywidgets.Label()
+
+        self.page_widget = ipywidgets.ToggleButtons(
+            description="Substation ID", layout=ipywidgets.Layout(width=widget_width)
+        )
+        self.page_widget.observe(self.select, names=["value"])
+
+        super().__init__(
+            children=(
+                ipywidgets.HBox(
+                    (
+                        self.search_widget,
+                        self.overloaded_button,
+                        self.previous_page_button,
+                        self.page_label,
+                        self.next_page_button,
+                    )
+                ),
+                self.page_widget,
+            )
+        )
+
+        self.value = int(self.substation_ids[0])
+        self.show_page(0)
+
+    @property
+    def num_pages(self) -> int:
+        """
+        Get the number of pages of the filtered substations.
+
+        Returns
+        -------
+        num_pages: int
+            Number of pages, at least one.
+        """
+        return max(1, -(-len(self.filtered_ids) // self.page_size))
+
+    def set_filtered_ids(self, filtered_ids: np.ndarray, labels: dict[int, str] | None = None):
+        """
+        Set the substations to choose from and show their first page.
+
+        Parameters
+        ----------
+        filtered_ids: np.ndarray
+            Substation IDs.
+        labels: dict[int, str] | None
+            Button labels of the substations, if other than their IDs.
+
+        Returns
+        -------
+        """
+        self.filtered_ids = filtered_ids
+        self.labels = {} if labels is None else labels
+        self.show_page(0)
+
+    def show_page(self, page: int):
+        """
+        Show a page of the filtered substations. The selected substation stays selected even if it's not on the page.
+
+        Parameters
+        ----------
+        page: int
+            Page index. Clipped to the valid range.
+
+        Returns
+        -------
+        """
+        self.page = min(max(page, 0), self.num_pages - 1)
+        page_ids = self.filtered_ids[self.page * self.page_size : (self.page + 1) * self.page_size]
+
+        # (label, value) pairs, so that a lone substation 0 is a valid option list
+        self.page_widget.unobserve(self.select, names=["value"])
+        self.page_widget.options = [
+            (self.labels.get(substation_id, str(substation_id)), substation_id) for substation_id in page_ids.tolist()
+        ]
+        self.page_widget.value = self.value if self.value in page_ids else None
+        self.page_widget.observe(self.select, names=["value"])
+
+        self.page_label.value = f"{self.page + 1}/{self.num_pages}"
+
+    def select(self, *args, **kwargs):
+        """
+        Select the substation chosen on the current page.
+
+        Parameters
+        ----------
+        args
+        kwargs
+
+        Returns
+        -------
+        """
+        if self.page_widget.value is not None:
+            self.value = self.page_widget.value
+
+    def search(self, *args, **kwargs):
+        """
+        Filter the substations by whether their ID or name contain the search query.
+
+        Parameters
+        ----------
+        args
+        kwargs
+
+        Returns
+        -------
+        """
+        query = self.search_widget.value.strip().lower()
+
+        if not query:
+            self.set_filtered_ids(self.substation_ids)
+            return
+
+        matches = np.char.find(self.substation_ids.astype(str), query) >= 0
+        matches |= np.char.find(self.substation_names, query) >= 0
+        self.set_filtered_ids(self.substation_ids[matches])
+
+    def show_overloaded(self, *args, **kwargs):
+        """
+        Filter the substations down to the ones attached to lines with a rho of at least the game's rho threshold,
+        sorted from the most to the least loaded, and select the most loaded one.
+
+        Parameters
+        ----------
+        args
+        kwargs
+
+        Returns
+        -------
+        """
+        max_rho = self.game.topology.max_rho_per_substation(self.game.observation.rho)
+
+        overloaded_ids = np.flatnonzero(max_rho >= self.game.rho_threshold)
+        overloaded_ids = overloaded_ids[np.argsort(-max_rho[overloaded_ids], kind="stable")]
+
+        self.clear_search()
+
+        labels = {
+            int(substation_id): f"{substation_id} ({max_rho[substation_id]:.0%})" for substation_id in overloaded_ids
+        }
+        self.set_filtered_ids(overloaded_ids, labels)
+
+        if overloaded_ids.size > 0:
+            self.page_widget.value = int(overloaded_ids[0])
+
+    def set_disabled(self, disabled: bool):
+        """
+        Enable or disable the search, the buttons and the substation widget.
+
+        Parameters
+        ----------
+        disabled: bool
+            True to disable the widgets.
+
+        Returns
+        -------
+        """
+        for widget in (
+            self.search_widget,
+            self.overloaded_button,
+            self.previous_page_button,
+            self.next_page_button,
+            self.page_widget,
+        ):
+            widget.disabled = disabled
+
+    def reset(self):
+        """
+        Clear the search, show the first page of all the substations and select the first one.
+
+        Returns
+        -------
+        """
+        self.clear_search()
+
+        self.value = int(self.substation_ids[0])
+        self.set_filtered_ids(self.substation_ids)
+
+    def clear_search(self):
+        """
+        Clear the search query without filtering the substations again.
+
+        Returns
+        -------
+        """
+        self.search_widget.unobserve(self.search, names=["value"])
+        self.search_widget.value = ""
+        self.search_widget.observe(self.search, names=["value"])
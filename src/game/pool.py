@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.config.environment.environment import EnvironmentConfig
+from src.environment.factory import make_environment
+from src.game.game import Game
+from src.game.utils import seek_chronics, seek_random_start
+
+if TYPE_CHECKING:
+    from grid2op.Environment import Environment
+
+# every worker process gets its own environment once and reuses it for all of its rollouts
+_worker_environment: Environment | None = None
+
+
+@dataclass
+class RolloutResults:
+    """Stacked results of the rollouts. The i-th row of each array belongs to the i-th rollout."""
+
+    chronics_ids: np.ndarray
+    start_steps: np.ndarray
+    observations: np.ndarray
+    rewards: np.ndarray
+    cumulative_rewards: np.ndarray
+    stop_steps: np.ndarray
+    done: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.stop_steps)
+
+
+def _init_worker(environment_config: EnvironmentConfig):
+    """
+    Initialize the environment of a worker process. Forked workers inherit the environment built by the parent process,
+    so only workers started otherwise have to build their own.
+
+    Parameters
+    ----------
+    environment_config: EnvironmentConfig
+        Environment config.
+
+    Returns
+    -------
+    """
+    global _worker_environment  # pylint: disable=global-statement
+    _worker_environment = make_environment(environment_config)
+
+
+def _rollout(rollout_id: int, seed: int, random_start: bool, rho_threshold: float, max_steps: int | None) -> tuple:
+    """
+    Reset the worker environment and keep doing nothing until any of the lines become overloaded, the episode is done,
+    or the maximum number of steps is reached.
+
+    Parameters
+    ----------
+    rollout_id: int
+        Rollout ID. Used to pick the chronics of the rollout if it doesn't start at a random point.
+    seed: int
+        Random seed of the rollout.
+    random_start: bool
+        If True, start from a random time step of randomly chosen chronics. Otherwise, start from the beginning.
+    rho_threshold: float
+        Overload threshold.
+    max_steps: int | None
+        Maximum number of steps. If None, the rollout isn't limited.
+
+    Returns
+    -------
+    chronics_id: str
+        Name of the chronics folder.
+    start_step: int
+        Start time step.
+    observation_vector: np.ndarray
+        Vector representation of the last observation.
+    reward: float
+        Last reward.
+    cumulative_reward: float
+        Cumulative reward.
+    stop_step: int
+        Time step at which the rollout stopped.
+    done: bool
+        Done signal.
+    """
+    environment = _worker_environment
+    do_nothing_action = environment.action_space({})
+
+    if random_start:
+        observation, chronics_id, start_step = seek_random_start(environment, np.random.default_rng(seed), seed=seed)
+    else:
+        observation = seek_chronics(environment, rollout_id, seed=seed)
+        chronics_id, start_step = environment.chronics_handler.get_name(), int(observation.current_step)
+
+    reward = 0.0
+    cumulative_reward = 0.0
+    done = False
+
+    num_steps = 0
+    while max_steps is None or num_steps < max_steps:
+        observation, reward, done, _ = environment.step(do_nothing_action)
+        cumulative_reward += reward
+        num_steps += 1
+
+        if done or (observation.rho >= rho_threshold).any():
+            break
+
+    return chronics_id, start_step, observation.to_vect(), reward, cumulative_reward, observation.current_step, done
+
+
+class GamePool:
+    """
+    A pool of worker processes, each running its own copy of the environment, that simulate the game in parallel. Every
+    rollout keeps doing nothing until any of the lines become overloaded, same as `Game.continue_simulation`.
+    """
+
+    def __init__(
+        self,
+        environment_config: EnvironmentConfig,
+        num_workers: int | None = None,
+        rho_threshold: float = Game.rho_threshold,
+        max_steps: int | None = None,
+        random_start: bool = False,
+    ):
+        self.environment_config = environment_config
+        self.num_workers = os.cpu_count() if num_workers is None else num_workers
+        self.rho_threshold = rho_threshold
+        self.max_steps = max_steps
+        self.random_start = random_start
+
+        # built once before the workers are forked, so that they inherit it instead of building their own
+        make_environment(environment_config)
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.num_workers, initializer=_init_worker, initargs=(environment_config,)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Shut down the worker processes.
+
+        Returns
+        -------
+        """
+        self.executor.shutdown()
+
+    def run(self, num_rollouts: int, seed: int = 0, start: int = 0) -> RolloutResults:
+        """
+        Run the rollouts in parallel. Unlike `Game.continue_simulation`, a done signal doesn't raise an error, it's
+        recorded in the results instead, so that one failed rollout doesn't throw away all the others.
+
+        Parameters
+        ----------
+        num_rollouts: int
+            Number of rollouts.
+        seed: int
+            Random seed. The i-th rollout is seeded with seed + i.
+        start: int
+            ID of the first rollout, so that consecutive runs continue where the previous one stopped instead of
+            repeating the same rollouts.
+
+        Returns
+        -------
+        results: RolloutResults
+            Stacked rollout results.
+        """
+        rollout_ids = range(start, start + num_rollouts)
+        chunksize = max(1, num_rollouts // (4 * self.num_workers))
+
+        results = list(
+            self.executor.map(
+                _rollout,
+                rollout_ids,
+                [seed + rollout_id for rollout_id in rollout_ids],
+                [self.random_start] * num_rollouts,
+                [self.rho_threshold] * num_rollouts,
+                [self.max_steps] * num_rollouts,
+                chunksize=chunksize,
+            )
+        )
+
+        chronics_ids, start_steps, observations, rewards, cumulative_rewards, stop_steps, done = zip(*results)
+
+        return RolloutResults(
+            chronics_ids=np.array(chronics_ids),
+            start_steps=np.array(start_steps, dtype=np.int64),
+            observations=np.stack(observations),
+            rewards=np.array(rewards, dtype=np.float32),
+            cumulative_rewards=np.array(cumulative_rewards, dtype=np.float64),
+            stop_steps=np.array(stop_steps, dtype=np.int64),
+            done=np.array(done, dtype=bool),
+        )
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src import DATA_DIR
+
+if TYPE_CHECKING:
+    from grid2op import Observation
+
+EPISODES_DIR = DATA_DIR / "episodes"
+INDEX_FILENAME = "index.json"
+
+
+def get_chunk_paths(directory: Path, chunk_idx: int) -> dict[str, Path]:
+    """
+    Get the paths of the files of a chunk.
+
+    Parameters
+    ----------
+    directory: Path
+        Episode directory.
+    chunk_idx: int
+        Chunk index.
+
+    Returns
+    -------
+    chunk_paths: dict[str, Path]
+        Path of the file of each field.
+    """
+    return {field: directory / f"{field}_{chunk_idx:05d}.npy" for field in ("observations", "rewards", "done")}
+
+
+class EpisodeRecorder:
+    """
+    Records the observations, rewards and done signals of an episode into memory-mapped .npy files. The files are
+    preallocated in chunks of a fixed number of steps, so appending a step doesn't reallocate anything and the episode
+    never has to fit into memory. A small index file keeps track of the chunks.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        observation_size: int,
+        chunk_size: int = 4096,
+        directory: Path = EPISODES_DIR,
+        metadata: dict | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        name: str
+            Name of the episode, i.e., of its directory.
+        observation_size: int
+            Size of the vector representation of an observation.
+        chunk_size: int
+            Number of steps per chunk.
+        directory: Path
+            Directory in which the episode directory is created.
+        metadata: dict | None
+            JSON serializable information stored in the index, e.g., the environment name.
+        """
+        self.directory = directory / name
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.observation_size = int(observation_size)
+        self.chunk_size = chunk_size
+        self.metadata = {} if metadata is None else metadata
+
+        self.chunk_lengths: list[int] = []
+        self.chunk = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(self.chunk_lengths)
+
+    def new_chunk(self):
+        """
+        Flush the current chunk and preallocate the next one.
+
+        Returns
+        -------
+        """
+        self.flush()
+
+        chunk_paths = get_chunk_paths(self.directory, len(self.chunk_lengths))
+        self.chunk = {
+            "observations": np.lib.format.open_memmap(
+                chunk_paths["observations"],
+                mode="w+",
+                dtype=np.float32,
+                shape=(self.chunk_size, self.observation_size),
+            ),
+            "rewards": np.lib.format.open_memmap(
+                chunk_paths["rewards"], mode="w+", dtype=np.float32, shape=(self.chunk_size,)
+            ),
+            "done": np.lib.format.open_memmap(chunk_paths["done"], mode="w+", dtype=bool, shape=(self.chunk_size,)),
+        }
+        self.chunk_lengths.append(0)
+
+    def append(self, observation: Observation, reward: float, done: bool):
+        """
+        Append a step to the episode.
+
+        Parameters
+        ----------
+        observation: Observation
+            Observation.
+        reward: float
+            Reward.
+        done: bool
+            Done signal.
+
+        Returns
+        -------
+        """
+        if self.chunk is None or self.chunk_lengths[-1] == self.chunk_size:
+            self.new_chunk()
+
+        step = self.chunk_lengths[-1]
+        self.chunk["observations"][step] = observation.to_vect()
+        self.chunk["rewards"][step] = reward
+        self.chunk["done"][step] = done
+        self.chunk_lengths[-1] += 1
+
+    def flush(self):
+        """
+        Flush the current chunk to disk and update the index.
+
+        Returns
+        -------
+        """
+        if self.chunk is not None:
+            for array in self.chunk.values():
+                array.flush()
+
+        index = {
+            "observation_size": self.observation_size,
+            "chunk_size": self.chunk_size,
+            "num_steps": len(self),
+            "chunk_lengths": self.chunk_lengths,
+            "metadata": self.metadata,
+        }
+        with open(self.directory / INDEX_FILENAME, "w", encoding="UTF-8") as file:
+            json.dump(index, file, indent=4)
+
+    def close(self):
+        """
+        Flush the episode and release the memory maps.
+
+        Returns
+        -------
+        """
+        self.flush()
+        self.chunk = None
+
+
+class EpisodeReader:
+    """
+    Reads an episode written by the EpisodeRecorder. The chunks are memory-mapped read-only, so nothing is loaded into
+    memory until it's accessed.
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Parameters
+        ----------
+        directory: Path
+            Episode directory.
+        """
+        self.directory = Path(directory)
+
+        with open(self.directory / INDEX_FILENAME, "r", encoding="UTF-8") as file:
+            index = json.load(file)
+
+        self.metadata = index["metadata"]
+        self.observations = []
+        self.rewards = []
+        self.done = []
+        for chunk_idx, chunk_length in enumerate(index["chunk_lengths"]):
+            chunk_paths = get_chunk_paths(self.directory, chunk_idx)
+            self.observations.append(np.load(chunk_paths["observations"], mmap_mode="r")[:chunk_length])
+            self.rewards.append(np.load(chunk_paths["rewards"], mmap_mode="r")[:chunk_length])
+            self.done.append(np.load(chunk_paths["done"], mmap_mode="r")[:chunk_length])
+
+        self.chunk_offsets = np.cumsum([0] + index["chunk_lengths"])
+
+    def __len__(self) -> int:
+        return int(self.chunk_offsets[-1])
+
+    def __getitem__(self, step: int) -> tuple[np.ndarray, float, bool]:
+        """
+        Get a step of the episode.
+
+        Parameters
+        ----------
+        step: int
+            Step index.
+
+        Returns
+        -------
+        observation_vector: np.ndarray
+            Vector representation of the observation. A view into the memory map.
+        reward: float
+            Reward.
+        done: bool
+            Done signal.
+
+        Raises
+        ------
+        IndexError
+            If the step is out of range.
+        """
+        if not 0 <= step < len(self):
+            raise IndexError(f"Step {step} is out of range for an episode with {len(self)} steps")
+
+        chunk_idx = np.searchsorted(self.chunk_offsets, step, side="right") - 1
+        step_in_chunk = step - self.chunk_offsets[chunk_idx]
+
+        return (
+            self.observations[chunk_idx][step_in_chunk],
+            float(self.rewards[chunk_idx][step_in_chunk]),
+            bool(self.done[chunk_idx][step_in_chunk]),
+        )
@@ -0,0 +1,111 @@
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+
+@dataclass
+class SessionAction:
+    """A set_bus action applied by the player, stored sparsely as the changed topology vector positions."""
+
+    time_step: int
+    positions: list[int]
+    busbars: list[int]
+
+    @classmethod
+    def from_set_bus_vector(cls, time_step: int, set_bus_vector: np.ndarray) -> "SessionAction":
+        """
+        Create the session action from a set_bus vector.
+
+        Parameters
+        ----------
+        time_step: int
+            Time step at which the action was applied.
+        set_bus_vector: np.ndarray
+            Set bus vector, where 0 means no change.
+
+        Returns
+        -------
+        session_action: SessionAction
+            Session action.
+        """
+        positions = np.flatnonzero(set_bus_vector)
+
+        return cls(time_step, positions.tolist(), set_bus_vector[positions].tolist())
+
+    def to_set_bus_vector(self, dim_topo: int) -> np.ndarray:
+        """
+        Get the set_bus vector of the action.
+
+        Parameters
+        ----------
+        dim_topo: int
+            Size of the topology vector.
+
+        Returns
+        -------
+        set_bus_vector: np.ndarray
+            Set bus vector, where 0 means no change.
+        """
+        set_bus_vector = np.zeros(dim_topo, dtype=np.int8)
+        set_bus_vector[self.positions] = self.busbars
+
+        return set_bus_vector
+
+
+@dataclass
+class SessionLog:
+    """
+    Everything needed to restore a game session: where the episode started, the actions the player applied, and where
+    the session currently is. The do-nothing steps in between aren't stored.
+    """
+
+    environment_name: str
+    chronics_id: str
+    start_step: int
+    seed: int | None = None
+    actions: list[SessionAction] = field(default_factory=list)
+    time_step: int = 0
+    cumulative_reward: float = 0.0
+    topo_vect: list[int] = field(default_factory=list)
+
+    def save(self, path: Path):
+        """
+        Save the session log as JSON.
+
+        Parameters
+        ----------
+        path: Path
+            File path.
+
+        Returns
+        -------
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, "w", encoding="UTF-8") as file:
+            json.dump(asdict(self), file)
+
+    @classmethod
+    def load(cls, path: Path) -> "SessionLog":
+        """
+        Load a session log saved as JSON.
+
+        Parameters
+        ----------
+        path: Path
+            File path.
+
+        Returns
+        -------
+        session_log: SessionLog
+            Session log.
+        """
+        with open(path, "r", encoding="UTF-8") as file:
+            session_dict = json.load(file)
+
+        session_dict["actions"] = [SessionAction(**session_action) for session_action in session_dict["actions"]]
+
+        return cls(**session_dict)
@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.game.game import Game
+
+
+@dataclass
+class TopologySearchResults:
+    """The best bus assignments of a substation, sorted from the largest to the smallest maximum rho reduction."""
+
+    substation_id: int
+    set_bus_vectors: np.ndarray
+    max_rho: np.ndarray
+    rho_reduction: np.ndarray
+    reward: np.ndarray
+    done: np.ndarray
+    baseline_max_rho: float
+    num_evaluated: int
+
+
+def enumerate_bus_assignments(is_line: np.ndarray, n_busbar: int, allow_lone_lines: bool = True) -> np.ndarray:
+    """
+    Enumerate all the valid assignments of the elements of a substation to its busbars.
+
+    Assignments that only differ by a permutation of the busbars are the same topology, so only the canonical one is
+    kept, i.e., the one where the busbars are numbered in the order in which they first appear. Same as in grid2op,
+    an assignment is valid if every used busbar has at least one line connected to it, e.g., a load can't be alone on
+    a busbar.
+
+    Parameters
+    ----------
+    is_line: np.ndarray
+        Boolean mask telling which of the elements are line ends.
+    n_busbar: int
+        Number of busbars per substation.
+    allow_lone_lines: bool
+        If False, every used busbar needs at least two elements connected to it.
+
+    Returns
+    -------
+    assignments: np.ndarray
+        Array of shape (num_assignments, num_elements) with the busbar of each element.
+    """
+    # build the canonical assignments element by element; the next element can go to any busbar that's already used or
+    # to the first unused one
+    assignments = np.ones((1, 1), dtype=np.int8)
+    max_busbars = np.ones(1, dtype=np.int8)
+    for _ in range(1, is_line.size):
+        extended_assignments = []
+        extended_max_busbars = []
+        for busbar in range(1, n_busbar + 1):
+            mask = busbar <= max_busbars + 1
+            extended_assignments.append(np.hstack((assignments[mask], np.full((mask.sum(), 1), busbar, dtype=np.int8))))
+            extended_max_busbars.append(np.maximum(max_busbars[mask], busbar))
+
+        assignments = np.concatenate(extended_assignments)
+        max_busbars = np.concatenate(extended_max_busbars)
+
+    valid = np.ones(len(assignments), dtype=bool)
+    for busbar in range(1, n_busbar + 1):
+        on_busbar = assignments == busbar
+        used = on_busbar.any(axis=1)
+
+        valid &= ~used | on_busbar[:, is_line].any(axis=1)
+        if not allow_lone_lines:
+            valid &= ~used | (on_busbar.sum(axis=1) >= 2)
+
+    return assignments[valid]
+
+
+def canonical_bus_assignment(busbars: np.ndarray) -> np.ndarray:
+    """
+    Renumber the busbars in the order in which they first appear.
+
+    Parameters
+    ----------
+    busbars: np.ndarray
+        Busbar of each element.
+
+    Returns
+    -------
+    canonical_busbars: np.ndarray
+        Canonical busbar of each element.
+    """
+    _, first_idx, inverse = np.unique(busbars, return_index=True, return_inverse=True)
+    order_of_appearance = np.argsort(np.argsort(first_idx))
+
+    return (order_of_appearance[inverse] + 1).astype(np.int8)
+
+
+def search_substation_topologies(
+    game: Game,
+    substation_id: int,
+    top_k: int = 10,
+    num_workers: int | None = None,
+    allow_lone_lines: bool = True,
+) -> TopologySearchResults:
+    """
+    Evaluate every valid bus assignment of the substation one step into the future from the current state of the game,
+    and return the ones that reduce the maximum rho the most. The reduction is measured against doing nothing. Elements
+    that are currently disconnected are left untouched.
+
+    Parameters
+    ----------
+    game: Game
+        Game.
+    substation_id: int
+        Substation ID.
+    top_k: int
+        Number of best assignments to return.
+    num_workers: int | None
+        Number of worker processes. If None, use all the CPUs.
+    allow_lone_lines: bool
+        If False, every used busbar needs at least two elements connected to it.
+
+    Returns
+    -------
+    results: TopologySearchResults
+        The best assignments.
+    """
+    positions, is_line = game.topology.topo_vect_positions_at(substation_id)
+
+    connected = game.observation.topo_vect[positions] > 0
+    positions, is_line = positions[connected], is_line[connected]
+
+    assignments = enumerate_bus_assignments(is_line, game.environment.n_busbar_per_sub, allow_lone_lines)
+
+    # the current topology of the substation is the same as doing nothing
+    current_assignment = canonical_bus_assignment(game.observation.topo_vect[positions])
+    assignments = assignments[(assignments != current_assignment).any(axis=1)]
+
+    # the first vector is the do nothing baseline
+    set_bus_vectors = np.zeros((len(assignments) + 1, game.environment.dim_topo), dtype=np.int8)
+    set_bus_vectors[1:, positions] = assignments
+
+    evaluation = game.evaluate_actions(set_bus_vectors, num_workers)
+    baseline_max_rho = evaluation["max_rho"][0]
+    evaluation = evaluation[1:]
+    rho_reduction = baseline_max_rho - evaluation["max_rho"]
+
+    best = np.argsort(-rho_reduction, kind="stable")[:top_k]
+
+    return TopologySearchResults(
+        substation_id=substation_id,
+        set_bus_vectors=set_bus_vectors[1:][best],
+        max_rho=evaluation["max_rho"][best],
+        rho_reduction=rho_reduction[best],
+        reward=evaluation["reward"][best],
+        done=evaluation["done"][best],
+        baseline_max_rho=float(baseline_max_rho),
+        num_evaluated=len(assignments),
+    )
@@ -1,108 +1,349 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
 import numpy as np
-from grid2op.Environment import Environment
 
+if TYPE_CHECKING:
+    from grid2op import Observation
+    from grid2op.Environment import Environment
 
-def get_line_id(environment: Environment, substation_id: int, line_destination: int) -> tuple[np.array, np.array]:
+
+def group_by_substation(element_to_subid: np.ndarray, n_sub: int) -> tuple[np.ndarray, np.ndarray]:
     """
-    Get the line index for both the OR and EX direction. Only one of these will contain a value, while the other one
-    will be an empty array.
+    Group the elements by the substation they're attached to, in a CSR-like format. The elements attached to substation
+    i are element_ids[pointers[i]:pointers[i + 1]], sorted by their ID.
 
     Parameters
     ----------
-    environment: Environment
-        Environment
-    substation_id: int
-        Substation ID.
-    line_destination: int
-        Connecting substation ID, e.g., line destination.
+    element_to_subid: np.ndarray
+        Substation ID of every element.
+    n_sub: int
+        Number of substations.
 
     Returns
     -------
-    line_or_idx: np.array
-        Array of size 1x1 if the line originates at substation_id. Otherwise, an empty array.
-    line_ex_idx: np.array
-        Array of size 1x1 if the line finishes at substation_id. Otherwise, an empty array.
+    pointers: np.ndarray
+        Array of size n_sub + 1 with the start of each substation's group.
+    element_ids: np.ndarray
+        Element IDs sorted by substation.
+    """
+    pointers = np.zeros(n_sub + 1, dtype=np.int64)
+    pointers[1:] = np.cumsum(np.bincount(element_to_subid, minlength=n_sub))
+    element_ids = np.argsort(element_to_subid, kind="stable")
+
+    return pointers, element_ids
+
+
+class TopologyIndex:
+    """
+    Lookups of the elements attached to each substation and of the lines between pairs of substations. The topology
+    doesn't change for an environment, so everything is precomputed once, and a lookup doesn't scale with the size of
+    the grid.
     """
-    line_or_mask = (environment.line_or_to_subid == substation_id) & (environment.line_ex_to_subid == line_destination)
-    line_ex_mask = (environment.line_ex_to_subid == substation_id) & (environment.line_or_to_subid == line_destination)
 
-    line_or_idx = np.argwhere(line_or_mask)
-    line_ex_idx = np.argwhere(line_ex_mask)
+    def __init__(self, environment: Environment):
+        self.line_or_to_subid = environment.line_or_to_subid
+        self.line_ex_to_subid = environment.line_ex_to_subid
+
+        n_sub = environment.n_sub
+        self.n_sub = n_sub
+        self.lines_or_pointers, self.lines_or = group_by_substation(environment.line_or_to_subid, n_sub)
+        self.lines_ex_pointers, self.lines_ex = group_by_substation(environment.line_ex_to_subid, n_sub)
+        self.gens_pointers, self.gens = group_by_substation(environment.gen_to_subid, n_sub)
+        self.loads_pointers, self.loads = group_by_substation(environment.load_to_subid, n_sub)
+        self.storages_pointers, self.storages = group_by_substation(environment.storage_to_subid, n_sub)
+
+        self.line_or_pos_topo_vect = environment.line_or_pos_topo_vect
+        self.line_ex_pos_topo_vect = environment.line_ex_pos_topo_vect
+        self.gen_pos_topo_vect = environment.gen_pos_topo_vect
+        self.load_pos_topo_vect = environment.load_pos_topo_vect
+        self.storage_pos_topo_vect = environment.storage_pos_topo_vect
+
+        # (substation ID, line destination) -> lines originating at the substation and lines finishing at it
+        line_lists = {}
+        for line_idx, (line_or_subid, line_ex_subid) in enumerate(zip(self.line_or_to_subid, self.line_ex_to_subid)):
+            line_lists.setdefault((int(line_or_subid), int(line_ex_subid)), ([], []))[0].append(line_idx)
+            line_lists.setdefault((int(line_ex_subid), int(line_or_subid)), ([], []))[1].append(line_idx)
+
+        self.line_ids = {
+            key: (np.array(lines_or, dtype=np.int64), np.array(lines_ex, dtype=np.int64))
+            for key, (lines_or, lines_ex) in line_lists.items()
+        }
+        self.no_line_ids = (np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+
+    def lines_or_at(self, substation_id: int) -> np.ndarray:
+        """
+        Get the IDs of the lines originating at the substation.
+
+        Parameters
+        ----------
+        substation_id: int
+            Substation ID.
+
+        Returns
+        -------
+        line_ids: np.ndarray
+            Line IDs.
+        """
+        return self.lines_or[self.lines_or_pointers[substation_id] : self.lines_or_pointers[substation_id + 1]]
+
+    def lines_ex_at(self, substation_id: int) -> np.ndarray:
+        """
+        Get the IDs of the lines finishing at the substation.
+
+        Parameters
+        ----------
+        substation_id: int
+            Substation ID.
+
+        Returns
+        -------
+        line_ids: np.ndarray
+            Line IDs.
+        """
+        return self.lines_ex[self.lines_ex_pointers[substation_id] : self.lines_ex_pointers[substation_id + 1]]
+
+    def gens_at(self, substation_id: int) -> np.ndarray:
+        """
+        Get the IDs of the generators attached to the substation.
+
+        Parameters
+        ----------
+        substation_id: int
+            Substation ID.
+
+        Returns
+        -------
+        gen_ids: np.ndarray
+            Generator IDs.
+        """
+        return self.gens[self.gens_pointers[substation_id] : self.gens_pointers[substation_id + 1]]
+
+    def loads_at(self, substation_id: int) -> np.ndarray:
+        """
+        Get the IDs of the loads attached to the substation.
+
+        Parameters
+        ----------
+        substation_id: int
+            Substation ID.
+
+        Returns
+        -------
+        load_ids: np.ndarray
+            Load IDs.
+        """
+        return self.loads[self.loads_pointers[substation_id] : self.loads_pointers[substation_id + 1]]
+
+    def storages_at(self, substation_id: int) -> np.ndarray:
+        """
+        Get the IDs of the storage units attached to the substation.
+
+        Parameters
+        ----------
+        substation_id: int
+            Substation ID.
+
+        Returns
+        -------
+        storage_ids: np.ndarray
+            Storage IDs.
+        """
+        return self.storages[self.storages_pointers[substation_id] : self.storages_pointers[substation_id + 1]]
 
-    return line_or_idx, line_ex_idx
+    def line_destinations(self, substation_id: int) -> np.ndarray:
+        """
+        Get the substations at the other end of the lines connected to the substation. Lines finishing at the substation
+        come first, then the lines originating at it.
 
+        Parameters
+        ----------
+        substation_id: int
+            Substation ID.
 
-def get_busbar_status(
-    element_idx: int,
-    action_list: list[tuple[int, int]],
-    element_busbar_statuses: np.array,
-    disregard_action_dict: bool = False,
-):
+        Returns
+        -------
+        line_destinations: np.ndarray
+            Connecting substation IDs.
+        """
+        return np.concatenate(
+            (
+                self.line_or_to_subid[self.lines_ex_at(substation_id)],
+                self.line_ex_to_subid[self.lines_or_at(substation_id)],
+            )
+        )
+
+    def topo_vect_positions_at(self, substation_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the positions in the topology vector of all the elements attached to the substation.
+
+        Parameters
+        ----------
+        substation_id: int
+            Substation ID.
+
+        Returns
+        -------
+        positions: np.ndarray
+            Sorted positions in the topology vector.
+        is_line: np.ndarray
+            Boolean mask telling which of the elements are line ends.
+        """
+        line_positions = np.concatenate(
+            (
+                self.line_or_pos_topo_vect[self.lines_or_at(substation_id)],
+                self.line_ex_pos_topo_vect[self.lines_ex_at(substation_id)],
+            )
+        )
+        other_positions = np.concatenate(
+            (
+                self.gen_pos_topo_vect[self.gens_at(substation_id)],
+                self.load_pos_topo_vect[self.loads_at(substation_id)],
+                self.storage_pos_topo_vect[self.storages_at(substation_id)],
+            )
+        )
+        positions = np.concatenate((line_positions, other_positions))
+        is_line = np.arange(positions.size) < line_positions.size
+
+        order = np.argsort(positions)
+
+        return positions[order], is_line[order]
+
+    def get_line_id(self, substation_id: int, line_destination: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the line index for both the OR and EX direction. Only one of these will contain a value, while the other one
+        will be an empty array.
+
+        Parameters
+        ----------
+        substation_id: int
+            Substation ID.
+        line_destination: int
+            Connecting substation ID, e.g., line destination.
+
+        Returns
+        -------
+        line_or_idx: np.ndarray
+            Array of size 1 if the line originates at substation_id. Otherwise, an empty array.
+        line_ex_idx: np.ndarray
+            Array of size 1 if the line finishes at substation_id. Otherwise, an empty array.
+        """
+        return self.line_ids.get((substation_id, line_destination), self.no_line_ids)
+
+    def max_rho_per_substation(self, rho: np.ndarray) -> np.ndarray:
+        """
+        Get the largest rho of the lines attached to each substation, on either side.
+
+        Parameters
+        ----------
+        rho: np.ndarray
+            Rho of every line.
+
+        Returns
+        -------
+        max_rho: np.ndarray
+            Largest rho per substation. Zero for substations without lines.
+        """
+        max_rho = np.zeros(self.n_sub, dtype=rho.dtype)
+        np.maximum.at(max_rho, self.line_or_to_subid, rho)
+        np.maximum.at(max_rho, self.line_ex_to_subid, rho)
+
+        return max_rho
+
+
+def fast_forward_chronics(environment: Environment, num_steps: int) -> Observation:
     """
-    Get the status of a given busbar. If an action has been performed return the status after the action, otherwise read
-    the status from the environment observation.
+    Skip the given number of time steps of the chronics without simulating the steps in between.
+
+    grid2op's `fast_forward_chronics(n)` skips max(1, n - 1) time steps and then takes one more step, so skipping a
+    single time step would move two. A single time step is therefore taken with a do-nothing step instead.
 
     Parameters
     ----------
-    element_idx: int
-        Line index.
-    action_list: list[tuple[int, int]]
-        List of actions performed.
-    element_busbar_statuses: np.array
-        Numpy array containing the status of busbars of the elements.
-    disregard_action_dict: bool
-        If True, then disregard the action dictionary and just read the status from the observation.
+    environment: Environment
+        Environment.
+    num_steps: int
+        Number of time steps to skip. Nothing happens if it's not positive.
 
     Returns
     -------
-    busbar_status: int
-        Busbar status.
+    observation: Observation
+        Observation after skipping.
     """
-    for action_tuple in action_list:
-        if action_tuple[0] == element_idx:
-            return action_tuple[1]
+    if num_steps == 1:
+        observation, _, _, _ = environment.step(environment.action_space({}))
+        return observation
 
-    return element_busbar_statuses[element_idx]
+    if num_steps > 1:
+        environment.fast_forward_chronics(num_steps)
 
+    return environment.get_obs()
 
-def add_or_overwrite_action(
-    new_action_tuple: tuple[int, int], action_list: list[tuple[int, int]], element_busbar_statuses: np.array
-) -> list[tuple[int, int]]:
+
+def seek_chronics(
+    environment: Environment, chronics_id: int | str | None = None, start_step: int = 0, seed: int | None = None
+) -> Observation:
     """
-    Add the new action tuple if the element being acted upon is not already there. Otherwise, overwrite the action for
-    that element.
+    Reset the environment directly to the given time step of the given chronics. The chronics are fast-forwarded with
+    `fast_forward_chronics`, i.e., the skipped time steps aren't simulated, and the time step of the observation matches
+    the position in the chronics.
 
     Parameters
     ----------
-    new_action_tuple: tuple[int, int]
-        New action tuple (line_idx, busbar).
-    action_list: list[tuple[int, int]]
-        Action list.
-    element_busbar_statuses: np.array
-        Numpy array containing the status of the lines and their busbars.
+    environment: Environment
+        Environment.
+    chronics_id: int | str | None
+        Chronics ID, either its index or the name of its folder. If None, the next chronics are used.
+    start_step: int
+        Time step to start from.
+    seed: int | None
+        Random seed of the environment. If None, the environment isn't reseeded.
 
     Returns
     -------
-    updated_action_list: list[tuple[int, int]]
-        Updated action list.
+    observation: Observation
+        Observation at the start time step.
+    """
+    options = {} if chronics_id is None else {"time serie id": chronics_id}
+    environment.reset(seed=seed, options=options)
+
+    return fast_forward_chronics(environment, start_step)
+
+
+def seek_random_start(
+    environment: Environment, rng: np.random.Generator, seed: int | None = None
+) -> tuple[Observation, str, int]:
     """
-    exists_flag = False
-    for i in range(len(action_list)):
-        if action_list[i][0] == new_action_tuple[0]:
-            action_list[i] = new_action_tuple
+    Reset the environment to a random time step of randomly chosen chronics.
 
-            # if the action just reverts everything to the original state
-            if element_busbar_statuses[new_action_tuple[0]] == new_action_tuple[1]:
-                del action_list[i]
+    Parameters
+    ----------
+    environment: Environment
+        Environment. The chronics need to be stored in multiple folders, which is the case for all the L2RPN datasets.
+    rng: np.random.Generator
+        Random number generator used to sample the start point.
+    seed: int | None
+        Random seed of the environment. If None, the environment isn't reseeded.
 
-            exists_flag = True
-            break
+    Returns
+    -------
+    observation: Observation
+        Observation at the start time step.
+    chronics_id: str
+        Name of the chosen chronics folder.
+    start_step: int
+        Chosen time step.
+    """
+    chronics_paths = environment.chronics_handler.real_data.available_chronics()
+    chronics_id = os.path.basename(rng.choice(chronics_paths))
 
-    # add action if it doesn't already exist and if it actually changes the current state
-    if not exists_flag and element_busbar_statuses[new_action_tuple[0]] != new_action_tuple[1]:
-        action_list.append(new_action_tuple)
+    # the length of the chronics is only known once they're loaded, so go to the start and fast-forward from there
+    seek_chronics(environment, chronics_id, seed=seed)
+    observation = fast_forward_chronics(environment, int(rng.integers(environment.chronics_handler.max_timestep())))
 
-    return action_list
+    return observation, chronics_id, int(observation.current_step)
 
 
 DONT_CLICK_THIS = "Don't click this."
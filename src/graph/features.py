@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator
+
+import numpy as np
+import scipy.sparse as sp
+import torch
+from torch_geometric.data import Batch, Data
+
+from src.game.recorder import EpisodeReader
+from src.graph.positional_encodings import substation_graph_edge_index
+
+if TYPE_CHECKING:
+    from grid2op import Observation
+    from grid2op.Environment import Environment
+
+NODE_FEATURES = ("gen_p", "gen_q", "load_p", "load_q")
+EDGE_FEATURES = ("rho", "p_or", "q_or", "p_ex", "q_ex", "line_status")
+
+
+def element_to_substation_matrix(element_to_subid: np.ndarray, n_sub: int) -> sp.csr_matrix:
+    """
+    Get the sparse matrix that sums the values of elements, e.g., generators, per substation.
+
+    Parameters
+    ----------
+    element_to_subid: np.ndarray
+        Substation ID of every element.
+    n_sub: int
+        Number of substations.
+
+    Returns
+    -------
+    matrix: sp.csr_matrix
+        Matrix of shape (n_sub, num_elements).
+    """
+    num_elements = len(element_to_subid)
+
+    return sp.csr_matrix(
+        (np.ones(num_elements, dtype=np.float32), (element_to_subid, np.arange(num_elements))),
+        shape=(n_sub, num_elements),
+    )
+
+
+class ObservationGraphBuilder:
+    """
+    Converts observations into PyG graphs of the substation graph, i.e., one node per substation and one edge per line
+    from its origin to its extremity substation. The node features are the generator and load injections summed per
+    substation, and the edge features are the line loadings, flows and statuses.
+
+    The features are sliced out of the vector representations of the observations for a whole batch at once, and the
+    batched edge index, batch vector and pointers only depend on the batch size, so they're built once and cached. No
+    graph is constructed per observation.
+    """
+
+    def __init__(self, environment: Environment):
+        """
+        Parameters
+        ----------
+        environment: Environment
+            Environment.
+        """
+        self.n_sub = environment.n_sub
+        self.n_line = environment.n_line
+        self.observation_size = environment.observation_space.size()
+
+        self.vector_slices = {}
+        for attribute in NODE_FEATURES + EDGE_FEATURES:
+            start, end, _ = environment.observation_space.get_indx_extract(attribute)
+            self.vector_slices[attribute] = slice(start, end)
+
+        self.node_aggregation = {
+            "gen_p": element_to_substation_matrix(environment.gen_to_subid, self.n_sub),
+            "gen_q": element_to_substation_matrix(environment.gen_to_subid, self.n_sub),
+            "load_p": element_to_substation_matrix(environment.load_to_subid, self.n_sub),
+            "load_q": element_to_substation_matrix(environment.load_to_subid, self.n_sub),
+        }
+
+        self.edge_index = torch.from_numpy(substation_graph_edge_index(environment))
+        self.batch_structures: dict[int, dict[str, torch.Tensor]] = {}
+
+    def node_features(self, observation_vectors: np.ndarray) -> np.ndarray:
+        """
+        Get the node features of a batch of observations.
+
+        Parameters
+        ----------
+        observation_vectors: np.ndarray
+            Vector representations of the observations, of shape (batch_size, observation_size).
+
+        Returns
+        -------
+        node_features: np.ndarray
+            Node features of shape (batch_size, n_sub, len(NODE_FEATURES)).
+        """
+        node_features = np.empty((len(observation_vectors), self.n_sub, len(NODE_FEATURES)), dtype=np.float32)
+        for i, attribute in enumerate(NODE_FEATURES):
+            # sparse @ dense, because dense @ sparse isn't dispatched to scipy
+            aggregation = self.node_aggregation[attribute]
+            node_features[:, :, i] = (aggregation @ observation_vectors[:, self.vector_slices[attribute]].T).T
+
+        return node_features
+
+    def edge_features(self, observation_vectors: np.ndarray) -> np.ndarray:
+        """
+        Get the edge features of a batch of observations.
+
+        Parameters
+        ----------
+        observation_vectors: np.ndarray
+            Vector representations of the observations, of shape (batch_size, observation_size).
+
+        Returns
+        -------
+        edge_features: np.ndarray
+            Edge features of shape (batch_size, n_line, len(EDGE_FEATURES)).
+        """
+        edge_features = np.empty((len(observation_vectors), self.n_line, len(EDGE_FEATURES)), dtype=np.float32)
+        for i, attribute in enumerate(EDGE_FEATURES):
+            edge_features[:, :, i] = observation_vectors[:, self.vector_slices[attribute]]
+
+        return edge_features
+
+    def get_batch_structure(self, batch_size: int) -> dict[str, torch.Tensor]:
+        """
+        Get the parts of a batch that only depend on the batch size. They're built the first time a batch size is
+        requested and cached afterward.
+
+        Parameters
+        ----------
+        batch_size: int
+            Number of graphs.
+
+        Returns
+        -------
+        batch_structure: dict[str, torch.Tensor]
+            Batched edge index, batch vector, node pointers, edge pointers and node offsets of the edges of every graph.
+        """
+        if batch_size not in self.batch_structures:
+            node_offsets = torch.arange(batch_size, dtype=torch.long) * self.n_sub
+
+            self.batch_structures[batch_size] = {
+                "edge_index": (self.edge_index.unsqueeze(0) + node_offsets.view(-1, 1, 1)).permute(1, 0, 2).flatten(1),
+                "batch": torch.arange(batch_size, dtype=torch.long).repeat_interleave(self.n_sub),
+                "ptr": torch.arange(batch_size + 1, dtype=torch.long) * self.n_sub,
+                "edge_ptr": torch.arange(batch_size + 1, dtype=torch.long) * self.n_line,
+                "node_offsets": node_offsets,
+            }
+
+        return self.batch_structures[batch_size]
+
+    def to_batch(self, observation_vectors: np.ndarray) -> Batch:
+        """
+        Convert a batch of observations into a PyG batch. The result is the same as `Batch.from_data_list` of the
+        graphs of the individual observations, including `to_data_list` and indexing.
+
+        Parameters
+        ----------
+        observation_vectors: np.ndarray
+            Vector representations of the observations, of shape (batch_size, observation_size).
+
+        Returns
+        -------
+        batch: Batch
+            Batch of graphs.
+
+        Raises
+        ------
+        ValueError
+            If the observation vectors don't match the observation space of the environment.
+        """
+        observation_vectors = np.asarray(observation_vectors, dtype=np.float32)
+        if observation_vectors.ndim != 2 or observation_vectors.shape[1] != self.observation_size:
+            raise ValueError(
+                f"Expected observation vectors of shape (batch_size, {self.observation_size}),"
+                f" got {observation_vectors.shape}"
+            )
+
+        batch_size = len(observation_vectors)
+        batch_structure = self.get_batch_structure(batch_size)
+
+        batch = Batch(
+            x=torch.from_numpy(self.node_features(observation_vectors).reshape(-1, len(NODE_FEATURES))),
+            edge_index=batch_structure["edge_index"],
+            edge_attr=torch.from_numpy(self.edge_features(observation_vectors).reshape(-1, len(EDGE_FEATURES))),
+            batch=batch_structure["batch"],
+            ptr=batch_structure["ptr"],
+        )
+
+        # the bookkeeping of Batch.from_data_list, so that the batch can be split back into graphs
+        batch._num_graphs = batch_size  # pylint: disable=protected-access
+        batch._slice_dict = {  # pylint: disable=protected-access
+            "x": batch_structure["ptr"],
+            "edge_index": batch_structure["edge_ptr"],
+            "edge_attr": batch_structure["edge_ptr"],
+        }
+        batch._inc_dict = {  # pylint: disable=protected-access
+            "x": torch.zeros(batch_size, dtype=torch.long),
+            "edge_index": batch_structure["node_offsets"],
+            "edge_attr": torch.zeros(batch_size, dtype=torch.long),
+        }
+
+        return batch
+
+    def to_data(self, observation: Observation) -> Data:
+        """
+        Convert an observation into a PyG graph.
+
+        Parameters
+        ----------
+        observation: Observation
+            Observation.
+
+        Returns
+        -------
+        data: Data
+            Graph.
+        """
+        observation_vectors = observation.to_vect().reshape(1, -1).astype(np.float32)
+
+        return Data(
+            x=torch.from_numpy(self.node_features(observation_vectors)[0]),
+            edge_index=self.edge_index,
+            edge_attr=torch.from_numpy(self.edge_features(observation_vectors)[0]),
+        )
+
+    def observations_to_batch(self, observations: list[Observation]) -> Batch:
+        """
+        Convert a list of observations, e.g., collected while playing the game, into a PyG batch.
+
+        Parameters
+        ----------
+        observations: list[Observation]
+            Observations.
+
+        Returns
+        -------
+        batch: Batch
+            Batch of graphs.
+        """
+        return self.to_batch(np.stack([observation.to_vect() for observation in observations]))
+
+    def iter_batches(self, observation_vectors: np.ndarray, batch_size: int = 1024) -> Iterator[Batch]:
+        """
+        Convert observations into PyG batches, batch_size observations at a time. The observation vectors can be
+        memory-mapped, only one batch of them is loaded into memory at a time.
+
+        Parameters
+        ----------
+        observation_vectors: np.ndarray
+            Vector representations of the observations, of shape (num_observations, observation_size).
+        batch_size: int
+            Maximum number of graphs per batch.
+
+        Returns
+        -------
+        batches: Iterator[Batch]
+            Batches of graphs, in order.
+        """
+        for start in range(0, len(observation_vectors), batch_size):
+            yield self.to_batch(observation_vectors[start : start + batch_size])
+
+    def iter_episode_batches(self, reader: EpisodeReader, batch_size: int = 1024) -> Iterator[Batch]:
+        """
+        Convert a recorded episode into PyG batches. The batches don't span chunks of the episode, so the last batch of
+        every chunk can be smaller than batch_size.
+
+        Parameters
+        ----------
+        reader: EpisodeReader
+            Episode reader.
+        batch_size: int
+            Maximum number of graphs per batch.
+
+        Returns
+        -------
+        batches: Iterator[Batch]
+            Batches of graphs, in order.
+        """
+        for observation_vectors in reader.observations:
+            yield from self.iter_batches(observation_vectors, batch_size)
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import hashlib
+from enum import StrEnum
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import eigsh, lobpcg
+
+from src import DATA_DIR
+
+if TYPE_CHECKING:
+    from grid2op.Environment import Environment
+
+POSITIONAL_ENCODINGS_DIR = DATA_DIR / "positional_encodings"
+
+
+class EigenSolver(StrEnum):
+    AUTO = "auto"
+    DENSE = "dense"
+    SHIFT_INVERT = "shift_invert"
+    LOBPCG = "lobpcg"
+
+
+class GraphType(StrEnum):
+    SUBSTATION = "substation"
+    LINE = "line"
+
+
+def substation_graph_edge_index(environment: Environment) -> np.ndarray:
+    """
+    Get the edge index of the substation graph, i.e., one edge per line from its origin to its extremity substation.
+
+    Parameters
+    ----------
+    environment: Environment
+        Environment.
+
+    Returns
+    -------
+    edge_index: np.ndarray
+        Edge index of shape (2, n_line).
+    """
+    return np.stack((environment.line_or_to_subid, environment.line_ex_to_subid)).astype(np.int64)
+
+
+def adjacency_matrix(edge_index: np.ndarray, num_nodes: int) -> sp.csr_matrix:
+    """
+    Get the binary, symmetric adjacency matrix of a graph, without self loops. Parallel edges are merged.
+
+    Parameters
+    ----------
+    edge_index: np.ndarray
+        Edge index of shape (2, num_edges).
+    num_nodes: int
+        Number of nodes.
+
+    Returns
+    -------
+    adjacency: sp.csr_matrix
+        Adjacency matrix.
+    """
+    source, target = edge_index
+    not_loop = source != target
+    source, target = source[not_loop], target[not_loop]
+
+    adjacency = sp.coo_matrix(
+        (np.ones(2 * source.size), (np.concatenate((source, target)), np.concatenate((target, source)))),
+        shape=(num_nodes, num_nodes),
+    ).tocsr()
+    adjacency.data[:] = 1.0
+
+    return adjacency
+
+
+def line_graph_adjacency(edge_index: np.ndarray, num_nodes: int) -> sp.csr_matrix:
+    """
+    Get the adjacency matrix of the line graph, i.e., the graph whose nodes are the edges of the given graph, in the
+    order of the edge index, and where two of them are adjacent if they share an endpoint. It's computed as a sparse
+    product of incidence matrices, so it never materializes anything dense.
+
+    Parameters
+    ----------
+    edge_index: np.ndarray
+        Edge index of shape (2, num_edges).
+    num_nodes: int
+        Number of nodes.
+
+    Returns
+    -------
+    adjacency: sp.csr_matrix
+        Adjacency matrix of shape (num_edges, num_edges).
+    """
+    num_edges = edge_index.shape[1]
+    incidence = sp.coo_matrix(
+        (np.ones(2 * num_edges), (edge_index.ravel(), np.tile(np.arange(num_edges), 2))),
+        shape=(num_nodes, num_edges),
+    ).tocsr()
+
+    adjacency = (incidence.T @ incidence).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    adjacency.data[:] = 1.0
+
+    return adjacency
+
+
+def normalized_laplacian(adjacency: sp.csr_matrix) -> sp.csr_matrix:
+    """
+    Get the symmetrically normalized Laplacian I - D^(-1/2) A D^(-1/2). The rows of isolated nodes are zero apart from
+    the diagonal.
+
+    Parameters
+    ----------
+    adjacency: sp.csr_matrix
+        Adjacency matrix.
+
+    Returns
+    -------
+    laplacian: sp.csr_matrix
+        Normalized Laplacian.
+    """
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    inverse_sqrt_degree = np.divide(1.0, np.sqrt(degree), out=np.zeros_like(degree), where=degree > 0)
+    normalization = sp.diags(inverse_sqrt_degree)
+
+    return (sp.identity(adjacency.shape[0], format="csr") - normalization @ adjacency @ normalization).tocsr()
+
+
+def laplacian_eigenvectors(
+    adjacency: sp.csr_matrix,
+    k: int,
+    solver: EigenSolver = EigenSolver.AUTO,
+    dense_threshold: int = 100,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Compute the eigenvectors of the k smallest non-trivial eigenvalues of the normalized Laplacian, same as
+    `torch_geometric.transforms.AddLaplacianEigenvectorPE`, i.e., the eigenvector of the smallest eigenvalue is skipped.
+
+    Small graphs are solved densely. For large ones, shift-invert mode factorizes the Laplacian once and converges in
+    a few iterations; LOBPCG only needs sparse products, so it's an option when the factorization doesn't fit in memory.
+    The signs of eigenvectors are arbitrary, so they are fixed by making the entry with the largest magnitude positive,
+    which makes the result reproducible.
+
+    Parameters
+    ----------
+    adjacency: sp.csr_matrix
+        Adjacency matrix.
+    k: int
+        Number of eigenvectors.
+    solver: EigenSolver
+        Eigensolver. AUTO uses the dense solver for graphs with at most dense_threshold nodes, and shift-invert
+        otherwise.
+    dense_threshold: int
+        Largest number of nodes that is solved densely by the AUTO solver.
+    seed: int
+        Random seed of the initial guess of the iterative solvers.
+
+    Returns
+    -------
+    eigenvectors: np.ndarray
+        Eigenvectors of shape (num_nodes, k), sorted by eigenvalue.
+
+    Raises
+    ------
+    ValueError
+        If the graph doesn't have more than k nodes, or if the solver is unknown.
+    """
+    num_nodes = adjacency.shape[0]
+    if k >= num_nodes:
+        raise ValueError(f"Can't compute {k} non-trivial eigenvectors of a graph with {num_nodes} nodes")
+
+    laplacian = normalized_laplacian(adjacency)
+    rng = np.random.default_rng(seed)
+
+    if solver == EigenSolver.AUTO:
+        solver = EigenSolver.DENSE if num_nodes <= dense_threshold else EigenSolver.SHIFT_INVERT
+
+    # LOBPCG needs the block to be small compared to the size of the problem
+    if solver == EigenSolver.LOBPCG and num_nodes < 5 * (k + 1):
+        solver = EigenSolver.DENSE
+
+    match solver:
+        case EigenSolver.DENSE:
+            eigenvalues, eigenvectors = np.linalg.eigh(laplacian.toarray())
+        case EigenSolver.SHIFT_INVERT:
+            # the Laplacian is singular, so shift slightly below its smallest eigenvalue, 0
+            eigenvalues, eigenvectors = eigsh(
+                laplacian, k=k + 1, sigma=-1e-3, which="LM", v0=rng.standard_normal(num_nodes)
+            )
+        case EigenSolver.LOBPCG:
+            eigenvalues, eigenvectors = lobpcg(
+                laplacian, rng.standard_normal((num_nodes, k + 1)), largest=False, tol=1e-8, maxiter=1000
+            )
+        case _:
+            raise ValueError(f"Unknown eigensolver {solver}")
+
+    order = np.argsort(eigenvalues, kind="stable")[1 : k + 1]
+    eigenvectors = eigenvectors[:, order]
+
+    signs = np.sign(eigenvectors[np.abs(eigenvectors).argmax(axis=0), np.arange(k)])
+    signs[signs == 0] = 1
+
+    return (eigenvectors * signs).astype(np.float32)
+
+
+def edge_average_encoding(node_encodings: np.ndarray, edge_index: np.ndarray) -> np.ndarray:
+    """
+    Average the encodings of the two endpoints of every edge, for all the components at once. Only indexing and
+    arithmetic are used, so it works with torch tensors as well.
+
+    Parameters
+    ----------
+    node_encodings: np.ndarray
+        Node encodings of shape (num_nodes, k).
+    edge_index: np.ndarray
+        Edge index of shape (2, num_edges).
+
+    Returns
+    -------
+    edge_encodings: np.ndarray
+        Edge encodings of shape (num_edges, k).
+    """
+    return (node_encodings[edge_index[0]] + node_encodings[edge_index[1]]) / 2
+
+
+def topology_hash(edge_index: np.ndarray, num_nodes: int) -> str:
+    """
+    Hash the topology of a graph, e.g., to tell apart the cached encodings of grids with the same name.
+
+    Parameters
+    ----------
+    edge_index: np.ndarray
+        Edge index of shape (2, num_edges).
+    num_nodes: int
+        Number of nodes.
+
+    Returns
+    -------
+    topology_hash: str
+        Short hex digest.
+    """
+    digest = hashlib.sha256(np.int64(num_nodes).tobytes())
+    digest.update(np.ascontiguousarray(edge_index, dtype=np.int64).tobytes())
+
+    return digest.hexdigest()[:16]
+
+
+def get_cache_path(
+    environment_name: str,
+    graph_type: GraphType,
+    edge_index: np.ndarray,
+    num_nodes: int,
+    k: int,
+    solver: EigenSolver,
+    directory: Path,
+) -> Path:
+    """
+    Get the path of the cached encodings of a graph.
+
+    Parameters
+    ----------
+    environment_name: str
+        Environment name.
+    graph_type: GraphType
+        Graph type.
+    edge_index: np.ndarray
+        Edge index of the substation graph.
+    num_nodes: int
+        Number of substations.
+    k: int
+        Number of eigenvectors.
+    solver: EigenSolver
+        Eigensolver. The solvers can return eigenvectors with different signs or bases, so they're cached separately.
+    directory: Path
+        Cache directory.
+
+    Returns
+    -------
+    cache_path: Path
+        Cache path.
+    """
+    return directory / f"{environment_name}_{graph_type}_{topology_hash(edge_index, num_nodes)}_k{k}_{solver}.npy"
+
+
+def laplacian_positional_encodings(
+    environment: Environment,
+    k: int,
+    graph_type: GraphType = GraphType.SUBSTATION,
+    solver: EigenSolver = EigenSolver.AUTO,
+    directory: Path | None = POSITIONAL_ENCODINGS_DIR,
+) -> np.ndarray:
+    """
+    Get the Laplacian eigenvector positional encodings of the substation graph, one per substation, or of its line
+    graph, one per line. The encodings are cached on disk, keyed by the environment name, graph type, topology hash, k
+    and eigensolver, so they're only computed once per grid.
+
+    Parameters
+    ----------
+    environment: Environment
+        Environment.
+    k: int
+        Number of eigenvectors.
+    graph_type: GraphType
+        Substation graph or line graph.
+    solver: EigenSolver
+        Eigensolver.
+    directory: Path | None
+        Cache directory. If None, nothing is cached.
+
+    Returns
+    -------
+    encodings: np.ndarray
+        Encodings of shape (n_sub, k) or (n_line, k).
+    """
+    edge_index = substation_graph_edge_index(environment)
+
+    cache_path = None
+    if directory is not None:
+        cache_path = get_cache_path(
+            environment.name, graph_type, edge_index, environment.n_sub, k, solver, Path(directory)
+        )
+        if cache_path.exists():
+            return np.load(cache_path)
+
+    if graph_type == GraphType.LINE:
+        adjacency = line_graph_adjacency(edge_index, environment.n_sub)
+    else:
+        adjacency = adjacency_matrix(edge_index, environment.n_sub)
+
+    encodings = laplacian_eigenvectors(adjacency, k, solver)
+
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(cache_path, encodings)
+
+    return encodings
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import matplotlib
+import numpy as np
+
+from src.config.config import Config
+from src.environment.factory import make_environment
+from src.game.recorder import EpisodeReader
+from src.plotting.grid_renderer import GridRenderer
+from src.plotting.utils import set_rcParams
+
+if TYPE_CHECKING:
+    from grid2op.Environment import Environment
+
+# every worker process builds its own environment, renderer and episode reader once and reuses them for all its frames
+_worker_state: tuple[Environment, GridRenderer, EpisodeReader] | None = None
+
+
+def get_frame_path(directory: Path, step: int, file_format: str) -> Path:
+    """
+    Get the path of the image file of a frame.
+
+    Parameters
+    ----------
+    directory: Path
+        Output directory.
+    step: int
+        Step of the episode.
+    file_format: str
+        Image file format, e.g., png or svg.
+
+    Returns
+    -------
+    frame_path: Path
+        Frame path.
+    """
+    return directory / f"frame_{step:05d}.{file_format}"
+
+
+def _init_worker(cfg: Config, episode_directory: Path):
+    """
+    Initialize the state of a worker process. The static layout of the grid is drawn once per worker. The environment is
+    the one built by the parent process, if the worker was forked.
+
+    Parameters
+    ----------
+    cfg: Config
+        Config.
+    episode_directory: Path
+        Directory of the recorded episode.
+
+    Returns
+    -------
+    """
+    global _worker_state  # pylint: disable=global-statement
+
+    matplotlib.use("Agg")
+    set_rcParams(cfg)
+
+    environment = make_environment(cfg.environment)
+    _worker_state = (environment, GridRenderer(environment), EpisodeReader(episode_directory))
+
+
+def _render_frames(steps: np.ndarray, output_directory: Path, file_format: str) -> list[Path]:
+    """
+    Render the steps of the episode of the worker to image files.
+
+    Parameters
+    ----------
+    steps: np.ndarray
+        Steps of the episode to render.
+    output_directory: Path
+        Output directory.
+    file_format: str
+        Image file format, e.g., png or svg.
+
+    Returns
+    -------
+    frame_paths: list[Path]
+        Paths of the rendered frames.
+    """
+    environment, renderer, episode = _worker_state
+
+    frame_paths = []
+    for step in steps:
+        observation_vector, reward, done = episode[step]
+        observation = environment.observation_space.from_vect(observation_vector, check_legit=False)
+
+        title = f"Step {step}, reward = {reward:.2f}" + (", done" if done else "")
+        renderer.update(observation, title, redraw=False)
+
+        frame_path = get_frame_path(output_directory, step, file_format)
+        renderer.figure.savefig(frame_path)
+        frame_paths.append(frame_path)
+
+    return frame_paths
+
+
+def render_episode(
+    cfg: Config,
+    episode_directory: Path,
+    output_directory: Path,
+    steps: np.ndarray | None = None,
+    file_format: str = "png",
+    num_workers: int | None = None,
+) -> tuple[list[Path], float]:
+    """
+    Render the observations of a recorded episode to image files with the Agg backend, in parallel. The steps are split
+    into contiguous chunks, one per worker, and every worker reuses its renderer, so the static layout of the grid is
+    only drawn once per worker.
+
+    Parameters
+    ----------
+    cfg: Config
+        Config. The environment must be the one the episode was recorded in.
+    episode_directory: Path
+        Directory of the episode, as written by the EpisodeRecorder.
+    output_directory: Path
+        Directory to save the frames to.
+    steps: np.ndarray | None
+        Steps of the episode to render. If None, render all of them.
+    file_format: str
+        Image file format, e.g., png or svg.
+    num_workers: int | None
+        Number of worker processes. If None, use all the CPUs.
+
+    Returns
+    -------
+    frame_paths: list[Path]
+        Paths of the rendered frames, in the order of the steps.
+    frames_per_second: float
+        Rendering throughput, including the startup of the workers.
+    """
+    output_directory = Path(output_directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+
+    if steps is None:
+        steps = np.arange(len(EpisodeReader(episode_directory)))
+
+    num_workers = os.cpu_count() if num_workers is None else num_workers
+    num_workers = max(1, min(num_workers, len(steps)))
+    chunks = np.array_split(steps, num_workers)
+
+    start_time = time.perf_counter()
+
+    # built once before the workers are forked, so that they inherit it instead of building their own
+    make_environment(cfg.environment)
+
+    with ProcessPoolExecutor(
+        max_workers=num_workers, initializer=_init_worker, initargs=(cfg, Path(episode_directory))
+    ) as executor:
+        frame_paths = [
+            frame_path
+            for chunk_frame_paths in executor.map(
+                _render_frames, chunks, [output_directory] * num_workers, [file_format] * num_workers
+            )
+            for frame_path in chunk_frame_paths
+        ]
+
+    return frame_paths, len(frame_paths) / (time.perf_counter() - start_time)
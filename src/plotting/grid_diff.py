@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from grid2op import Observation
+
+
+@dataclass
+class GridDiff:
+    """The differences between two observations of the same grid, e.g., the current state and an action preview."""
+
+    rho_delta: np.ndarray
+    changed_lines: np.ndarray
+    changed_line_ends: np.ndarray
+    changed_generators: np.ndarray
+    changed_loads: np.ndarray
+    changed_topo_vect: np.ndarray
+    changed_substations: np.ndarray
+
+    @property
+    def max_rho_delta(self) -> float:
+        """
+        Get the largest absolute change in rho.
+
+        Returns
+        -------
+        max_rho_delta: float
+            Largest absolute change in rho.
+        """
+        return float(np.abs(self.rho_delta).max(initial=0.0))
+
+
+def compute_grid_diff(
+    base_observation: Observation, observation: Observation, topo_vect_to_sub: np.ndarray, rho_tolerance: float = 0.01
+) -> GridDiff:
+    """
+    Compute the differences between two observations of the same grid.
+
+    Parameters
+    ----------
+    base_observation: Observation
+        Observation to compare against, e.g., the current state of the game.
+    observation: Observation
+        Observation to compare, e.g., the preview of an action.
+    topo_vect_to_sub: np.ndarray
+        Substation ID of every element of the topology vector.
+    rho_tolerance: float
+        Changes in rho at most this large don't count as changes.
+
+    Returns
+    -------
+    grid_diff: GridDiff
+        Differences.
+    """
+    rho_delta = observation.rho - base_observation.rho
+
+    changed_line_ends = np.concatenate(
+        (
+            observation.line_or_bus != base_observation.line_or_bus,
+            observation.line_ex_bus != base_observation.line_ex_bus,
+        )
+    )
+    changed_generators = observation.gen_bus != base_observation.gen_bus
+    changed_loads = observation.load_bus != base_observation.load_bus
+
+    changed_line_status = observation.line_status != base_observation.line_status
+    changed_lines = (np.abs(rho_delta) > rho_tolerance) | changed_line_status
+
+    changed_topo_vect = observation.topo_vect != base_observation.topo_vect
+    changed_substations = np.zeros(topo_vect_to_sub.max() + 1, dtype=bool)
+    changed_substations[topo_vect_to_sub[changed_topo_vect]] = True
+
+    return GridDiff(
+        rho_delta=rho_delta,
+        changed_lines=changed_lines,
+        changed_line_ends=changed_line_ends,
+        changed_generators=changed_generators,
+        changed_loads=changed_loads,
+        changed_topo_vect=changed_topo_vect,
+        changed_substations=changed_substations,
+    )
@@ -0,0 +1,432 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import LineCollection
+from matplotlib.colors import Normalize, to_rgba
+from matplotlib.figure import Figure
+
+from src.plotting.grid_diff import GridDiff, compute_grid_diff
+
+if TYPE_CHECKING:
+    from grid2op import Observation
+    from grid2op.Environment import Environment
+
+# colors of the busbars, indexed by the busbar number; index 0 is a disconnected element
+BUSBAR_COLORS = np.array([to_rgba(color) for color in ("none", "tab:blue", "tab:orange", "tab:purple", "tab:brown")])
+DISCONNECTED_COLOR = to_rgba("lightgray")
+
+
+class GridRenderer:
+    """
+    Renders observations of a power grid into a persistent figure. The static part of the figure, i.e., the substation
+    layout and names, is drawn once. Rendering an observation only updates the dynamic artists: the line colors (rho),
+    widths (active power flow), flow labels, busbars of the line ends, generators and loads, and the number of busbars
+    used per substation. Generators (triangles) and loads (squares) are drawn around their substations.
+
+    The figure isn't managed by pyplot, so it isn't displayed automatically; display it, e.g., with
+    `IPython.display.display(renderer.figure)`, or save it with `renderer.figure.savefig`. If the canvas supports
+    blitting and blit is True, updates only redraw the dynamic artists on top of a cached background. Animated artists
+    are left out of saved figures, so only blit on interactive canvases, e.g., ipympl.
+
+    A diff between two observations is rendered as an overlay on top of the base observation, which is only updated if
+    it isn't already the one shown. Only the changed lines, line ends, generators, loads and substations are
+    highlighted.
+    """
+
+    # how far along a line its end markers are drawn, as a fraction of the line length
+    line_end_offset: float = 0.2
+    # how far from its substation a generator or load is drawn, as a fraction of the shortest line length
+    injection_offset: float = 0.25
+
+    def __init__(
+        self,
+        environment: Environment,
+        figure: Figure | None = None,
+        colormap: str = "RdYlGn_r",
+        line_width_range: tuple[float, float] = (1.0, 6.0),
+        diff_colormap: str = "coolwarm",
+        max_rho_delta: float = 0.2,
+        blit: bool = False,
+    ):
+        """
+        Parameters
+        ----------
+        environment: Environment
+            Environment, used for the grid layout and the element positions.
+        figure: Figure | None
+            Figure to render into. If None, a new figure with an Agg canvas is created.
+        colormap: str
+            Colormap of the line loading (rho), saturated at 100%.
+        line_width_range: tuple[float, float]
+            Line widths of the lines with no flow and with the largest flow.
+        diff_colormap: str
+            Colormap of the changes in rho, saturated at -max_rho_delta and max_rho_delta.
+        max_rho_delta: float
+            Change in rho at which the diff colormap saturates.
+        blit: bool
+            If True and the canvas supports it, redraw only the dynamic artists on updates.
+        """
+        if figure is None:
+            figure = Figure()
+            FigureCanvasAgg(figure)
+
+        self.figure = figure
+        self.axes = figure.add_subplot()
+        self.colormap = colormaps[colormap]
+        self.norm = Normalize(vmin=0.0, vmax=1.0, clip=True)
+        self.line_width_range = line_width_range
+        self.diff_colormap = colormaps[diff_colormap]
+        self.diff_norm = Normalize(vmin=-max_rho_delta, vmax=max_rho_delta, clip=True)
+
+        self.substation_positions = np.array([environment.grid_layout[name] for name in environment.name_sub])
+        line_or_positions = self.substation_positions[environment.line_or_to_subid]
+        line_ex_positions = self.substation_positions[environment.line_ex_to_subid]
+
+        # topology vector elements are grouped by substation
+        self.topo_vect_to_sub = np.repeat(np.arange(environment.n_sub), environment.sub_info)
+
+        generator_positions, load_positions = self.get_injection_positions(environment)
+
+        self.draw_static(environment)
+
+        # dynamic artists
+        self.lines = LineCollection(np.stack((line_or_positions, line_ex_positions), axis=1), zorder=1)
+        self.axes.add_collection(self.lines)
+
+        midpoints = (line_or_positions + line_ex_positions) / 2
+        self.flow_labels = [
+            self.axes.text(x, y, "", ha="center", va="center", fontsize="x-small", zorder=4) for x, y in midpoints
+        ]
+
+        line_end_positions = np.concatenate(
+            (
+                line_or_positions + self.line_end_offset * (line_ex_positions - line_or_positions),
+                line_ex_positions + self.line_end_offset * (line_or_positions - line_ex_positions),
+            )
+        )
+        self.line_ends = self.axes.scatter(*line_end_positions.T, s=20, zorder=3)
+
+        self.generators = self.axes.scatter(*generator_positions.T, s=40, marker="^", edgecolors="black", zorder=3)
+        self.loads = self.axes.scatter(*load_positions.T, s=30, marker="s", edgecolors="black", zorder=3)
+
+        self.substations = self.axes.scatter(
+            *self.substation_positions.T, s=400, edgecolors="black", facecolors="white", zorder=2
+        )
+
+        # diff overlay, every element is drawn but stays transparent unless it changed
+        self.diff_lines = LineCollection(
+            np.stack((line_or_positions, line_ex_positions), axis=1),
+            colors="none",
+            linewidths=line_width_range[1] + 6,
+            zorder=0.5,
+        )
+        self.axes.add_collection(self.diff_lines)
+        self.diff_labels = [
+            self.axes.text(
+                x,
+                y,
+                "",
+                ha="center",
+                va="center",
+                fontsize="x-small",
+                fontweight="bold",
+                bbox={"boxstyle": "round", "facecolor": "white"},
+                zorder=4.5,
+            )
+            for x, y in midpoints
+        ]
+        self.diff_line_ends = self.axes.scatter(
+            *line_end_positions.T, s=60, facecolors="none", edgecolors="none", linewidths=1.5, zorder=3.5
+        )
+        self.diff_generators = self.axes.scatter(
+            *generator_positions.T, s=120, marker="^", facecolors="none", edgecolors="none", linewidths=1.5, zorder=3.5
+        )
+        self.diff_loads = self.axes.scatter(
+            *load_positions.T, s=90, marker="s", facecolors="none", edgecolors="none", linewidths=1.5, zorder=3.5
+        )
+        self.diff_substations = self.axes.scatter(
+            *self.substation_positions.T, s=800, facecolors="none", edgecolors="none", linewidths=3, zorder=1.5
+        )
+
+        self.title = self.figure.suptitle("")
+
+        self.dynamic_artists = [
+            self.lines,
+            *self.flow_labels,
+            self.line_ends,
+            self.generators,
+            self.loads,
+            self.substations,
+            self.diff_lines,
+            *self.diff_labels,
+            self.diff_line_ends,
+            self.diff_generators,
+            self.diff_loads,
+            self.diff_substations,
+            self.title,
+        ]
+
+        # the observation the base artists currently show
+        self.base_observation = None
+
+        self.blit = blit and self.figure.canvas.supports_blit
+        self.background = None
+        if self.blit:
+            for artist in self.dynamic_artists:
+                artist.set_animated(True)
+            self.figure.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def get_injection_positions(self, environment: Environment) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the positions of the generators and loads. The injections of a substation are spread evenly on a circle
+        around it, the generators first.
+
+        Parameters
+        ----------
+        environment: Environment
+            Environment.
+
+        Returns
+        -------
+        generator_positions: np.ndarray
+            Positions of the generators, of shape (n_gen, 2).
+        load_positions: np.ndarray
+            Positions of the loads, of shape (n_load, 2).
+        """
+        line_lengths = np.linalg.norm(
+            self.substation_positions[environment.line_or_to_subid]
+            - self.substation_positions[environment.line_ex_to_subid],
+            axis=1,
+        )
+        radius = self.injection_offset * line_lengths[line_lengths > 0].min()
+
+        injection_to_subid = np.concatenate((environment.gen_to_subid, environment.load_to_subid))
+        injections_per_sub = np.bincount(injection_to_subid, minlength=environment.n_sub)
+
+        # index of every injection among the injections of its substation
+        order = np.argsort(injection_to_subid, kind="stable")
+        sub_start = np.concatenate(([0], np.cumsum(injections_per_sub)[:-1]))
+        injection_idx = np.empty(len(injection_to_subid), dtype=int)
+        injection_idx[order] = np.arange(len(injection_to_subid)) - sub_start[injection_to_subid[order]]
+
+        angles = np.pi / 2 + 2 * np.pi * injection_idx / injections_per_sub[injection_to_subid]
+        positions = self.substation_positions[injection_to_subid] + radius * np.stack(
+            (np.cos(angles), np.sin(angles)), axis=1
+        )
+
+        return positions[: environment.n_gen], positions[environment.n_gen :]
+
+    def draw_static(self, environment: Environment):
+        """
+        Draw the parts of the figure that don't depend on the observation.
+
+        Parameters
+        ----------
+        environment: Environment
+            Environment.
+
+        Returns
+        -------
+        """
+        for substation_id, (x, y) in enumerate(self.substation_positions):
+            self.axes.text(x, y, str(substation_id), ha="center", va="center", fontsize="small", zorder=5)
+
+        self.figure.colorbar(
+            ScalarMappable(norm=self.norm, cmap=self.colormap),
+            ax=self.axes,
+            label="Line loading (rho)",
+            fraction=0.03,
+        )
+
+        # leave some room for the substation markers around the layout
+        margin = 0.05 * np.ptp(self.substation_positions, axis=0).max()
+        x_min, y_min = self.substation_positions.min(axis=0) - margin
+        x_max, y_max = self.substation_positions.max(axis=0) + margin
+        self.axes.set_xlim(x_min, x_max)
+        self.axes.set_ylim(y_min, y_max)
+        self.axes.set_aspect("equal")
+        self.axes.set_axis_off()
+        self.axes.set_title(environment.name, fontsize="small")
+
+    def update(self, observation: Observation, title: str = "", redraw: bool = True):
+        """
+        Update the dynamic artists to show the given observation and redraw the figure.
+
+        Parameters
+        ----------
+        observation: Observation
+            Observation.
+        title: str
+            Figure title.
+        redraw: bool
+            If False, only update the artists, e.g., when the figure is going to be saved or displayed anyway, which
+            draws it.
+
+        Returns
+        -------
+        """
+        line_colors = self.colormap(self.norm(observation.rho))
+        line_colors[~observation.line_status] = DISCONNECTED_COLOR
+        self.lines.set_color(line_colors)
+
+        flow = np.abs(observation.p_or)
+        min_width, max_width = self.line_width_range
+        self.lines.set_linewidths(min_width + (max_width - min_width) * flow / max(flow.max(), 1e-6))
+
+        flow_labels = np.char.mod("%.0f%%", 100 * observation.rho)
+        for flow_label, text, connected in zip(self.flow_labels, flow_labels, observation.line_status):
+            flow_label.set_text(text if connected else "")
+
+        line_end_busbars = np.clip(np.concatenate((observation.line_or_bus, observation.line_ex_bus)), 0, None)
+        self.line_ends.set_facecolors(BUSBAR_COLORS[line_end_busbars])
+        self.line_ends.set_edgecolors(BUSBAR_COLORS[line_end_busbars])
+
+        # disconnected generators and loads are left hollow
+        self.generators.set_facecolors(BUSBAR_COLORS[np.clip(observation.gen_bus, 0, None)])
+        self.loads.set_facecolors(BUSBAR_COLORS[np.clip(observation.load_bus, 0, None)])
+
+        # substations split into several busbars are colored by the number of busbars they use
+        used_busbars = np.zeros(len(self.substation_positions), dtype=int)
+        np.maximum.at(used_busbars, self.topo_vect_to_sub, observation.topo_vect)
+        substation_colors = np.where(used_busbars[:, None] > 1, BUSBAR_COLORS[used_busbars], to_rgba("white"))
+        self.substations.set_facecolors(substation_colors)
+
+        self.title.set_text(title)
+
+        self.base_observation = observation
+        self.clear_diff()
+
+        if redraw:
+            self.redraw()
+
+    def update_diff(
+        self,
+        base_observation: Observation,
+        observation: Observation,
+        title: str = "",
+        redraw: bool = True,
+        rho_tolerance: float = 0.01,
+    ) -> GridDiff:
+        """
+        Show the base observation and highlight what's different in the other observation: the changed lines are
+        outlined with the color of their change in rho and labeled with their rho before and after, the line ends,
+        generators, loads and substations with changed busbars are outlined as well, filled with their new busbar. The
+        base observation is only rendered if it isn't already shown.
+
+        Parameters
+        ----------
+        base_observation: Observation
+            Observation to compare against, e.g., the current state of the game.
+        observation: Observation
+            Observation to compare, e.g., the preview of an action.
+        title: str
+            Figure title.
+        redraw: bool
+            If False, only update the artists, e.g., when the figure is going to be saved or displayed anyway, which
+            draws it.
+        rho_tolerance: float
+            Changes in rho at most this large aren't highlighted.
+
+        Returns
+        -------
+        grid_diff: GridDiff
+            Differences between the observations.
+        """
+        if base_observation is not self.base_observation:
+            self.update(base_observation, redraw=False)
+
+        grid_diff = compute_grid_diff(base_observation, observation, self.topo_vect_to_sub, rho_tolerance)
+
+        line_colors = self.diff_colormap(self.diff_norm(grid_diff.rho_delta))
+        line_colors[~grid_diff.changed_lines] = 0.0
+        self.diff_lines.set_color(line_colors)
+
+        rho_before = np.char.mod("%.0f", 100 * base_observation.rho)
+        rho_after = np.char.mod("%.0f%%", 100 * observation.rho)
+        for diff_label, before, after, changed in zip(self.diff_labels, rho_before, rho_after, grid_diff.changed_lines):
+            diff_label.set_text(f"{before}→{after}" if changed else "")
+
+        line_end_busbars = np.clip(np.concatenate((observation.line_or_bus, observation.line_ex_bus)), 0, None)
+        line_end_colors = BUSBAR_COLORS[line_end_busbars]
+        line_end_colors[~grid_diff.changed_line_ends] = 0.0
+        self.diff_line_ends.set_facecolors(line_end_colors)
+        self.diff_line_ends.set_edgecolors(np.where(grid_diff.changed_line_ends[:, None], to_rgba("black"), 0.0))
+
+        for diff_injections, busbars, changed in (
+            (self.diff_generators, observation.gen_bus, grid_diff.changed_generators),
+            (self.diff_loads, observation.load_bus, grid_diff.changed_loads),
+        ):
+            injection_colors = BUSBAR_COLORS[np.clip(busbars, 0, None)]
+            injection_colors[~changed] = 0.0
+            diff_injections.set_facecolors(injection_colors)
+            diff_injections.set_edgecolors(np.where(changed[:, None], to_rgba("black"), 0.0))
+
+        self.diff_substations.set_edgecolors(np.where(grid_diff.changed_substations[:, None], to_rgba("black"), 0.0))
+
+        self.title.set_text(title)
+
+        if redraw:
+            self.redraw()
+
+        return grid_diff
+
+    def clear_diff(self):
+        """
+        Hide the diff overlay.
+
+        Returns
+        -------
+        """
+        self.diff_lines.set_color("none")
+        for diff_label in self.diff_labels:
+            diff_label.set_text("")
+        self.diff_line_ends.set_facecolors("none")
+        self.diff_line_ends.set_edgecolors("none")
+        for diff_injections in (self.diff_generators, self.diff_loads):
+            diff_injections.set_facecolors("none")
+            diff_injections.set_edgecolors("none")
+        self.diff_substations.set_edgecolors("none")
+
+    def redraw(self):
+        """
+        Redraw the figure. When blitting, only the dynamic artists are drawn on top of the cached background.
+
+        Returns
+        -------
+        """
+        canvas = self.figure.canvas
+
+        if not self.blit or self.background is None:
+            canvas.draw_idle()
+            return
+
+        canvas.restore_region(self.background)
+        for artist in self.dynamic_artists:
+            self.figure.draw_artist(artist)
+        canvas.blit(self.figure.bbox)
+        canvas.flush_events()
+
+    def on_draw(self, event):
+        """
+        Cache the background after a full draw, and draw the dynamic artists on top of it.
+
+        Parameters
+        ----------
+        event
+            Matplotlib draw event.
+
+        Returns
+        -------
+        """
+        canvas = self.figure.canvas
+        if event is not None and event.canvas != canvas:
+            return
+
+        self.background = canvas.copy_from_bbox(self.figure.bbox)
+        for artist in self.dynamic_artists:
+            self.figure.draw_artist(artist)
@@ -0,0 +1,7 @@
+import grid2op
+import pytest
+
+
+@pytest.fixture(scope="session")
+def environment():
+    return grid2op.make("l2rpn_case14_sandbox", test=True)
@@ -0,0 +1,47 @@
+from src.benchmarks.suite import (
+    BenchmarkResult,
+    find_regressions,
+    format_results,
+    load_results,
+    save_results,
+)
+
+BASELINE = [
+    BenchmarkResult("render", "case14", 0.010, "s"),
+    BenchmarkResult("continue_simulation", "case14", 1000.0, "steps/s", higher_is_better=True),
+]
+
+
+def test_find_regressions():
+    results = [
+        BenchmarkResult("render", "case14", 0.015, "s"),
+        BenchmarkResult("continue_simulation", "case14", 900.0, "steps/s", higher_is_better=True),
+        BenchmarkResult("apply_action", "case14", 1.0, "s"),
+    ]
+
+    regressions = find_regressions(results, BASELINE, tolerance=0.2)
+
+    # only the render got slower than the tolerance, and apply_action isn't in the baseline
+    assert [regression.key for regression in regressions] == ["case14/render"]
+    assert regressions[0].baseline == 0.010
+    assert regressions[0].value == 0.015
+
+
+def test_find_regressions_of_throughput():
+    results = [BenchmarkResult("continue_simulation", "case14", 500.0, "steps/s", higher_is_better=True)]
+
+    assert [regression.key for regression in find_regressions(results, BASELINE)] == ["case14/continue_simulation"]
+
+
+def test_save_and_load_results(tmp_path):
+    path = tmp_path / "benchmarks" / "results.json"
+    save_results(BASELINE, path)
+
+    assert load_results(path) == BASELINE
+
+
+def test_format_results():
+    results = [BenchmarkResult("render", "case14", 0.015, "s")]
+    table = format_results(results, BASELINE)
+
+    assert table.split() == ["case14/render", "15", "ms", "+50%"]
@@ -0,0 +1,21 @@
+import pytest
+
+from src.game.game import Game
+
+
+@pytest.mark.parametrize("progress_interval", [0, -1])
+def test_continue_simulation_rejects_progress_interval(environment, progress_interval):
+    game = Game(environment, chronics_id=0)
+
+    with pytest.raises(ValueError):
+        game.continue_simulation({}, progress_interval=progress_interval)
+
+    assert game.observation.current_step == 0
+
+
+def test_continue_simulation_reports_steps_per_second(environment):
+    game = Game(environment, chronics_id=0)
+    game.continue_simulation({}, progress_interval=None, should_stop=lambda: game.observation.current_step >= 3)
+
+    assert game.steps_per_second > 0
+    assert game.get_progress_description().endswith(f"({game.steps_per_second:.0f} steps/s)")
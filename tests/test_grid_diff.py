@@ -0,0 +1,18 @@
+import numpy as np
+
+from src.plotting.grid_diff import compute_grid_diff
+
+
+def test_changed_generators_and_loads(environment):
+    observation = environment.reset()
+
+    # the first generator and load are both connected to substation 1, the last two of its elements
+    action = environment.action_space({"set_bus": {"substations_id": [(1, [2, 2, 1, 1, 2, 2])]}})
+    preview, _, _, _ = observation.simulate(action)
+
+    topo_vect_to_sub = np.repeat(np.arange(environment.n_sub), environment.sub_info)
+    grid_diff = compute_grid_diff(observation, preview, topo_vect_to_sub)
+
+    assert np.flatnonzero(grid_diff.changed_generators).tolist() == [0]
+    assert np.flatnonzero(grid_diff.changed_loads).tolist() == [0]
+    assert np.flatnonzero(grid_diff.changed_substations).tolist() == [1]
@@ -0,0 +1,12 @@
+import pytest
+
+from src.benchmarks.import_times import measure_import_times
+
+HEAVY_PACKAGES = ("grid2op", "torch", "matplotlib")
+
+
+@pytest.mark.parametrize("module", ["src.game.game", "src.game.pool", "scripts.positional_encodings"])
+def test_heavy_packages_are_imported_lazily(module):
+    imported_packages = {record.package for record in measure_import_times(module)}
+
+    assert imported_packages.isdisjoint(HEAVY_PACKAGES)
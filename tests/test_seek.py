@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from src.game.game import Game
+from src.game.utils import seek_chronics, seek_random_start
+
+
+@pytest.mark.parametrize("start_step", [0, 1, 2, 5])
+def test_seek_chronics(environment, start_step):
+    observation = seek_chronics(environment, chronics_id=0, start_step=start_step)
+
+    assert observation.current_step == start_step
+
+
+@pytest.mark.parametrize("start_step", [0, 1, 2, 5])
+def test_game_start_step(environment, start_step):
+    game = Game(environment, chronics_id=0, start_step=start_step)
+
+    assert game.observation.current_step == start_step
+    assert game.start_step == start_step
+    assert game.session_log.start_step == start_step
+
+
+def test_seek_random_start(environment):
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        observation, _, start_step = seek_random_start(environment, rng, seed=0)
+
+        assert observation.current_step == start_step
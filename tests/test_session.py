@@ -0,0 +1,25 @@
+import numpy as np
+
+from src.game.game import Game
+from src.game.session import SessionLog
+
+
+def test_replay_back_to_back_actions(environment, tmp_path):
+    game = Game(environment, chronics_id=0)
+
+    # the second action is applied one step after the first one is, i.e., the replay has to skip exactly one step
+    action_a = {"set_bus": {"substations_id": [(1, [2, 2, 1, 1, 1, 1])]}}
+    game.continue_simulation(action_a, progress_interval=None, should_stop=lambda: game.observation.current_step >= 2)
+    action_b = {"set_bus": {"substations_id": [(5, [2, 1, 1, 2, 1, 1, 1])]}}
+    game.continue_simulation(action_b, progress_interval=None, should_stop=lambda: game.observation.current_step >= 5)
+
+    assert [session_action.time_step for session_action in game.session_log.actions] == [0, 2]
+    assert game.observation.current_step == 5
+
+    path = tmp_path / "session.json"
+    game.session_log.save(path)
+    replayed_game = Game.from_session(environment, SessionLog.load(path))
+
+    assert replayed_game.observation.current_step == 5
+    assert np.array_equal(replayed_game.observation.topo_vect, game.observation.topo_vect)
+    assert replayed_game.session_log.actions == game.session_log.actions
@@ -0,0 +1,26 @@
+import numpy as np
+
+from src.dataset.shards import (
+    ShardWriter,
+    extract_shard,
+    get_extracted_path,
+    get_shard_path,
+    read_index,
+)
+
+
+def write_dataset(directory, values, shard_size):
+    with ShardWriter("dataset", shard_size=shard_size, directory=directory) as writer:
+        writer.append({"values": values})
+
+
+def test_regenerated_dataset_isnt_read_from_stale_extractions(tmp_path):
+    write_dataset(tmp_path, np.arange(10), shard_size=4)
+    extract_shard(tmp_path / "dataset", 0, ["values"])
+
+    write_dataset(tmp_path, np.arange(10, 16), shard_size=8)
+    extract_shard(tmp_path / "dataset", 0, ["values"])
+
+    assert read_index(tmp_path / "dataset")["shard_lengths"] == [6]
+    assert not get_shard_path(tmp_path / "dataset", 1).exists()
+    assert np.array_equal(np.load(get_extracted_path(tmp_path / "dataset", 0, "values")), np.arange(10, 16))